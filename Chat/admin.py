@@ -1,3 +1,9 @@
 from django.contrib import admin
+from .models import ChatMessage
 
-# Register your models here.
+
+@admin.register(ChatMessage)
+class ChatMessageAdmin(admin.ModelAdmin):
+    list_display = ("session_id", "role", "created_at")
+    search_fields = ("session_id", "text")
+    list_filter = ("role", "created_at")
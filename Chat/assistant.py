@@ -0,0 +1,90 @@
+import asyncio
+
+import google.generativeai as genai
+from asgiref.sync import sync_to_async
+from decouple import config
+from django.conf import settings
+
+from .limits import ConcurrencyLimiter
+from .responses import ChatResponseCache
+from .sessions import DatabaseChatSessionStore, InMemoryChatSessionStore
+
+genai.configure(api_key=config("GOOGLE_API_KEY"))
+
+_session_store = None
+_response_cache = None
+_limiter = None
+
+
+def default_model_factory():
+    return genai.GenerativeModel(settings.CHAT_MODEL_NAME)
+
+
+def build_session_store(model_factory=default_model_factory):
+    options = {"max_size": settings.CHAT_SESSION_MAX_SIZE, "ttl": settings.CHAT_SESSION_TTL}
+    if settings.CHAT_SESSION_STORE == "database":
+        return DatabaseChatSessionStore(
+            model_factory, max_turns=settings.CHAT_HISTORY_MAX_TURNS, **options
+        )
+    return InMemoryChatSessionStore(model_factory, **options)
+
+
+def get_session_store():
+    global _session_store
+    if _session_store is None:
+        _session_store = build_session_store()
+    return _session_store
+
+
+def set_session_store(store):
+    """Swap the process-wide store, e.g. for one built around a fake model client."""
+    global _session_store
+    _session_store = store
+
+
+def get_response_cache():
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ChatResponseCache(
+            default_model_factory,
+            settings.CHAT_MODEL_NAME,
+            max_size=settings.CHAT_RESPONSE_CACHE_SIZE,
+            ttl=settings.CHAT_RESPONSE_CACHE_TTL,
+            timeout=settings.CHAT_UPSTREAM_TIMEOUT,
+        )
+    return _response_cache
+
+
+def set_response_cache(cache):
+    global _response_cache
+    _response_cache = cache
+
+
+def get_limiter():
+    global _limiter
+    if _limiter is None:
+        _limiter = ConcurrencyLimiter(
+            settings.CHAT_MAX_CONCURRENT, settings.CHAT_MAX_CONCURRENT_PER_USER
+        )
+    return _limiter
+
+
+def set_limiter(limiter):
+    global _limiter
+    _limiter = limiter
+
+
+async def iterate_in_thread(iterable, timeout=None):
+    """
+    Consume a blocking iterator (e.g. a streamed Gemini reply) without blocking the
+    loop. ``timeout`` bounds the wait for each item.
+    """
+    iterator = await sync_to_async(iter, thread_sensitive=False)(iterable)
+    done = object()
+    while True:
+        item = await asyncio.wait_for(
+            sync_to_async(next, thread_sensitive=False)(iterator, done), timeout
+        )
+        if item is done:
+            return
+        yield item
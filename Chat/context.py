@@ -0,0 +1,124 @@
+import hashlib
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from life_tracker_backend.metrics import record_cache_lookup
+from sharing.models import CollectionAccess
+from tasks.models import Task
+
+# Rough characters-per-token ratio for Gemini-style tokenizers
+CHARS_PER_TOKEN = 4
+
+
+def collection_version_key(collection_id):
+    return f"chat:context-version:{collection_id}"
+
+
+def context_key(user_id, day, fingerprint):
+    return f"chat:context:{user_id}:{day.isoformat()}:{fingerprint}"
+
+
+def bump_collection_versions(collection_ids):
+    """Mark the task context of every user with access to these collections as stale."""
+    cache.set_many(
+        {collection_version_key(cid): uuid.uuid4().hex for cid in set(collection_ids)}, None
+    )
+
+
+def format_task(row):
+    when = f"{row['due_date']:%a %Y-%m-%d} {row['start_time']:%H:%M}-{row['end_time']:%H:%M}"
+    return f"- {when} {row['title']} [{row['category']}, {row['collection__title']}]"
+
+
+def format_note(row):
+    content = " ".join(row["notes__content"].split())
+    if len(content) > settings.CHAT_CONTEXT_NOTE_CHARS:
+        content = content[: settings.CHAT_CONTEXT_NOTE_CHARS - 3] + "..."
+    return f"    note: {row['notes__title']}: {content}"
+
+
+def build_task_context(collection_ids, today):
+    """
+    Render upcoming, unfinished tasks (and their notes) in the given collections as a
+    plain-text block that stays within CHAT_CONTEXT_TOKEN_BUDGET.
+    """
+    horizon = today + timedelta(days=settings.CHAT_CONTEXT_DAYS)
+    # One query: tasks joined with their notes, one row per (task, note)
+    rows = (
+        Task.objects.filter(
+            collection_id__in=collection_ids,
+            completed=False,
+            due_date__gte=today,
+            due_date__lte=horizon,
+        )
+        .order_by("due_date", "start_time", "id", "notes__id")
+        .values(
+            "id",
+            "title",
+            "category",
+            "due_date",
+            "start_time",
+            "end_time",
+            "collection__title",
+            "notes__title",
+            "notes__content",
+        )[: settings.CHAT_CONTEXT_MAX_ROWS]
+    )
+
+    budget = settings.CHAT_CONTEXT_TOKEN_BUDGET * CHARS_PER_TOKEN
+    header = f"My tasks from {today:%Y-%m-%d} to {horizon:%Y-%m-%d}:"
+    lines, used, task_ids, skipped = [header], len(header), set(), set()
+    for row in rows:
+        is_new_task = row["id"] not in task_ids
+        if row["id"] in skipped or (not is_new_task and row["notes__title"] is None):
+            continue
+        block = [format_task(row)] if is_new_task else []
+        if row["notes__title"] is not None:
+            block.append(format_note(row))
+        size = sum(len(line) + 1 for line in block)
+        if used + size > budget:
+            if is_new_task:
+                skipped.add(row["id"])
+            continue
+        lines += block
+        used += size
+        task_ids.add(row["id"])
+
+    if skipped:
+        lines.append(f"- ...and {len(skipped)} more not shown")
+    elif not task_ids:
+        lines.append("- (no upcoming tasks)")
+    return "\n".join(lines)
+
+
+def get_task_context(user):
+    """
+    The user's task context block, cached until a task or note in one of their
+    collections changes, their set of collections changes, or the day rolls over.
+    """
+    today = timezone.localdate()
+    collection_ids = sorted(
+        CollectionAccess.objects.filter(user=user).values_list("collection_id", flat=True)
+    )
+    versions = cache.get_many([collection_version_key(cid) for cid in collection_ids])
+    fingerprint = hashlib.md5(
+        ",".join(
+            f"{cid}:{versions.get(collection_version_key(cid), '0')}" for cid in collection_ids
+        ).encode()
+    ).hexdigest()
+
+    key = context_key(user.id, today, fingerprint)
+    block = cache.get(key)
+    record_cache_lookup("chat_context", block is not None)
+    if block is None:
+        block = build_task_context(collection_ids, today)
+        cache.set(key, block, settings.CHAT_CONTEXT_CACHE_TIMEOUT)
+    return block
+
+
+def with_task_context(user, message):
+    return f"{get_task_context(user)}\n\n{message}"
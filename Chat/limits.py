@@ -0,0 +1,67 @@
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+
+class LimitExceeded(Exception):
+    def __init__(self, scope):
+        super().__init__(f"{scope} chat concurrency limit reached")
+        self.scope = scope  # "user" or "global"
+
+
+class ConcurrencyLimiter:
+    """
+    Non-blocking cap on in-flight chat calls, per process and per caller. A request
+    over either limit is rejected straight away instead of queueing behind the others.
+    """
+
+    def __init__(self, max_total, max_per_key):
+        self.max_total = max_total
+        self.max_per_key = max_per_key
+        self.active = 0
+        self._per_key = Counter()
+        self._lock = threading.Lock()
+        self.rejected = Counter()
+
+    def acquire(self, key):
+        with self._lock:
+            self._check(key)
+            self.active += 1
+            self._per_key[key] += 1
+
+    def check(self, key):
+        """Raise LimitExceeded if ``key`` could not get a slot right now, without taking one."""
+        with self._lock:
+            self._check(key)
+
+    def _check(self, key):
+        if self._per_key.get(key, 0) >= self.max_per_key:
+            self.rejected["user"] += 1
+            raise LimitExceeded("user")
+        if self.active >= self.max_total:
+            self.rejected["global"] += 1
+            raise LimitExceeded("global")
+
+    def release(self, key):
+        with self._lock:
+            self.active -= 1
+            self._per_key[key] -= 1
+            if not self._per_key[key]:
+                del self._per_key[key]
+
+    @contextmanager
+    def slot(self, key):
+        self.acquire(key)
+        try:
+            yield
+        finally:
+            self.release(key)
+
+    def stats(self):
+        return {
+            "active": self.active,
+            "max_total": self.max_total,
+            "max_per_user": self.max_per_key,
+            "rejected_user": self.rejected["user"],
+            "rejected_global": self.rejected["global"],
+        }
@@ -0,0 +1,38 @@
+# Generated by Django 5.2 on 2026-10-18 22:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="ChatMessage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("session_id", models.CharField(max_length=255)),
+                (
+                    "role",
+                    models.CharField(choices=[("user", "User"), ("model", "Model")], max_length=10),
+                ),
+                ("text", models.TextField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["session_id", "created_at"], name="Chat_chatme_session_d4e117_idx"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -1,3 +1,21 @@
 from django.db import models
 
-# Create your models here.
+
+class ChatMessage(models.Model):
+    """One turn of an assistant conversation, used to rebuild chats after eviction."""
+
+    ROLE_CHOICES = (
+        ("user", "User"),
+        ("model", "Model"),
+    )
+
+    session_id = models.CharField(max_length=255)
+    role = models.CharField(max_length=10, choices=ROLE_CHOICES)
+    text = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["session_id", "created_at"])]
+
+    def __str__(self):
+        return f"{self.session_id} [{self.role}]: {self.text[:50]}"
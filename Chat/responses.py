@@ -0,0 +1,90 @@
+import hashlib
+import threading
+import time
+
+from life_tracker_backend.metrics import record_cache_lookup
+from .sessions import LRUCache
+
+
+class _InflightCall:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class ChatResponseCache:
+    """
+    Exact-match reply cache for stateless prompts, keyed on the model name and the
+    normalized message. Identical prompts arriving while the first is still being
+    generated wait for that call instead of making their own.
+    """
+
+    def __init__(
+        self,
+        model_factory,
+        model_name,
+        max_size=500,
+        ttl=3600,
+        timeout=None,
+        clock=time.monotonic,
+    ):
+        self.model_factory = model_factory
+        self.model_name = model_name
+        self.timeout = timeout
+        self.entries = LRUCache(max_size, ttl, clock=clock)
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.upstream_calls = 0
+        self.coalesced = 0
+
+    def make_key(self, message):
+        normalized = " ".join(message.lower().split())
+        return hashlib.sha256(f"{self.model_name}\0{normalized}".encode()).hexdigest()
+
+    def generate(self, message):
+        self.upstream_calls += 1
+        request_options = {"timeout": self.timeout} if self.timeout else None
+        return self.model_factory().generate_content(message, request_options=request_options).text
+
+    def reply(self, message):
+        return self.get_or_generate(self.make_key(message), lambda: self.generate(message))
+
+    def get_or_generate(self, key, generate):
+        reply = self.entries.get(key)
+        record_cache_lookup("chat_response", reply is not None)
+        if reply is not None:
+            return reply
+
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _InflightCall()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = generate()
+            self.entries.set(key, call.result)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            call.done.set()
+        return call.result
+
+    def stats(self):
+        return {
+            **self.entries.stats(),
+            "upstream_calls": self.upstream_calls,
+            "coalesced": self.coalesced,
+        }
@@ -0,0 +1,112 @@
+import threading
+import time
+from collections import OrderedDict
+
+from life_tracker_backend.metrics import record_cache_lookup
+from .models import ChatMessage
+
+
+class LRUCache:
+    """Thread-safe LRU mapping with a per-entry TTL and hit/miss/eviction counters."""
+
+    def __init__(self, max_size, ttl, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= self.clock():
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, self.clock() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            return entry[0] if entry else None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class InMemoryChatSessionStore:
+    """
+    Keeps live chat sessions in a bounded LRU. Evicted or expired sessions start over
+    with an empty history.
+    """
+
+    def __init__(self, model_factory, max_size=1000, ttl=3600, clock=time.monotonic):
+        self.model_factory = model_factory
+        self.sessions = LRUCache(max_size, ttl, clock=clock)
+
+    def get_chat(self, session_id):
+        chat = self.sessions.get(session_id)
+        record_cache_lookup("chat_session", chat is not None)
+        if chat is None:
+            chat = self.model_factory().start_chat(history=self.load_history(session_id))
+            self.sessions.set(session_id, chat)
+        return chat
+
+    def load_history(self, session_id):
+        return []
+
+    def record_turn(self, session_id, message, reply):
+        pass
+
+    def stats(self):
+        return {"backend": type(self).__name__, **self.sessions.stats()}
+
+
+class DatabaseChatSessionStore(InMemoryChatSessionStore):
+    """
+    Same LRU in front, but every turn is persisted as ChatMessage rows so a session
+    evicted here, lost on restart or served by another worker is rebuilt from the
+    last ``max_turns`` exchanges.
+    """
+
+    def __init__(self, model_factory, max_size=1000, ttl=3600, max_turns=50, **kwargs):
+        super().__init__(model_factory, max_size=max_size, ttl=ttl, **kwargs)
+        self.max_turns = max_turns
+
+    def load_history(self, session_id):
+        rows = ChatMessage.objects.filter(session_id=session_id).order_by("-created_at", "-id")
+        rows = reversed(list(rows.values_list("role", "text")[: self.max_turns * 2]))
+        return [{"role": role, "parts": [text]} for role, text in rows]
+
+    def record_turn(self, session_id, message, reply):
+        ChatMessage.objects.bulk_create(
+            [
+                ChatMessage(session_id=session_id, role="user", text=message),
+                ChatMessage(session_id=session_id, role="model", text=reply),
+            ]
+        )
@@ -0,0 +1,41 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from tasks.models import Task
+from tracker.models import Note
+from .context import bump_collection_versions
+
+
+@receiver(pre_save, sender=Task)
+def task_changing(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Remember the stored collection so a moved task also refreshes the one it left
+    if raw or not instance.pk:
+        return
+    if update_fields is not None and not {"collection", "collection_id"} & set(update_fields):
+        return
+    instance._previous_collection_id = (
+        Task.objects.filter(pk=instance.pk).values_list("collection_id", flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def task_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    collection_ids = [instance.collection_id]
+    previous = getattr(instance, "_previous_collection_id", None)
+    if previous is not None:
+        collection_ids.append(previous)
+    bump_collection_versions(collection_ids)
+
+
+@receiver(post_save, sender=Note)
+@receiver(post_delete, sender=Note)
+def note_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    collection_ids = Task.objects.filter(id=instance.task_id).values_list(
+        "collection_id", flat=True
+    )
+    bump_collection_versions(collection_ids)
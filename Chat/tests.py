@@ -1,3 +1,401 @@
-from django.test import TestCase
+from types import SimpleNamespace
 
-# Create your tests here.
+import json
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.utils import timezone
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from rest_framework.test import APIClient
+
+from pages.models import Collection
+from users.tests import BaseAPITestCase
+from .assistant import get_session_store, set_response_cache, set_session_store
+from .assistant import set_limiter
+from .context import build_task_context, get_task_context
+from .limits import ConcurrencyLimiter, LimitExceeded
+from .models import ChatMessage
+from .responses import ChatResponseCache
+from .sessions import DatabaseChatSessionStore, InMemoryChatSessionStore, LRUCache
+from .views import chat_stream
+
+
+class FakeChat:
+    def __init__(self, history):
+        self.history = list(history)
+
+    def send_message(self, message, stream=False, request_options=None):
+        self.history.append({"role": "user", "parts": [message]})
+        reply = f"echo {message} ({len(self.history)})"
+        self.history.append({"role": "model", "parts": [reply]})
+        if stream:
+            return (SimpleNamespace(text=word + " ") for word in reply.split())
+        return SimpleNamespace(text=reply)
+
+
+class FakeModel:
+    started = []
+
+    def start_chat(self, history=None):
+        chat = FakeChat(history or [])
+        FakeModel.started.append(chat)
+        return chat
+
+
+class FakeModelWithReply(FakeModel):
+    def generate_content(self, message, request_options=None):
+        return SimpleNamespace(text=f"answer to {message}")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class LRUCacheTests(TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_size=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_expires_after_ttl(self):
+        clock = FakeClock()
+        cache = LRUCache(max_size=2, ttl=10, clock=clock)
+        cache.set("a", 1)
+        clock.now = 11
+        self.assertIsNone(cache.get("a"))
+        stats = cache.stats()
+        self.assertEqual((stats["size"], stats["expirations"], stats["misses"]), (0, 1, 1))
+
+
+class ChatSessionStoreTests(TestCase):
+    def setUp(self):
+        FakeModel.started = []
+
+    def test_memory_store_reuses_chat_until_evicted(self):
+        store = InMemoryChatSessionStore(FakeModel, max_size=1, ttl=60)
+        chat = store.get_chat("u1")
+        self.assertIs(store.get_chat("u1"), chat)
+        store.get_chat("u2")
+        self.assertIsNot(store.get_chat("u1"), chat)
+        self.assertEqual(store.stats()["evictions"], 2)
+
+    def test_database_store_rebuilds_history_on_miss(self):
+        store = DatabaseChatSessionStore(FakeModel, max_size=1, ttl=60, max_turns=1)
+        for text in ("first", "second"):
+            reply = store.get_chat("u1").send_message(text)
+            store.record_turn("u1", text, reply.text)
+        self.assertEqual(ChatMessage.objects.filter(session_id="u1").count(), 4)
+
+        store.get_chat("u2")  # pushes u1 out
+        rebuilt = store.get_chat("u1")
+        self.assertEqual(len(rebuilt.history), 2)  # only the last turn is replayed
+        self.assertEqual(rebuilt.history[0], {"role": "user", "parts": ["second"]})
+        self.assertEqual(rebuilt.history[1]["role"], "model")
+
+
+class ChatViewTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.previous_store = get_session_store()
+        set_session_store(InMemoryChatSessionStore(FakeModel, max_size=10, ttl=60))
+        self.addCleanup(set_session_store, self.previous_store)
+
+    def test_conversation_keeps_history(self):
+        url = reverse("chat_view")
+        self.client.post(url, {"user_id": "u1", "message": "hi"}, format="json")
+        response = self.client.post(url, {"user_id": "u1", "message": "again"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["response"], "echo again (3)")
+
+    def test_stateless_prompts_use_response_cache(self):
+        cache = ChatResponseCache(FakeModelWithReply, "model-a")
+        set_response_cache(cache)
+        self.addCleanup(set_response_cache, None)
+        for message in ("Plan my week", "plan my week"):
+            response = self.client.post(
+                reverse("chat_view"), {"message": message, "stateless": True}, format="json"
+            )
+            self.assertEqual(response.json()["response"], "answer to Plan my week")
+        self.assertEqual(cache.upstream_calls, 1)
+        self.assertEqual(len(get_session_store().sessions), 0)
+
+    def test_empty_message_rejected(self):
+        response = self.client.post(reverse("chat_view"), {"message": "  "}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+
+class ChatResponseCacheTests(TestCase):
+    def test_normalized_prompts_share_a_reply(self):
+        cache = ChatResponseCache(FakeModelWithReply, "model-a")
+        self.assertEqual(cache.reply("Plan my week"), "answer to Plan my week")
+        self.assertEqual(cache.reply("  plan my   WEEK "), "answer to Plan my week")
+        self.assertEqual(cache.upstream_calls, 1)
+        self.assertNotEqual(
+            cache.make_key("plan my week"),
+            ChatResponseCache(FakeModelWithReply, "model-b").make_key("plan my week"),
+        )
+
+    def test_concurrent_identical_prompts_are_coalesced(self):
+        cache = ChatResponseCache(FakeModelWithReply, "model-a")
+        release = threading.Event()
+        calls = []
+
+        def slow_generate():
+            calls.append(1)
+            release.wait(5)
+            return "shared"
+
+        results = []
+
+        def request():
+            results.append(cache.get_or_generate("k", slow_generate))
+
+        threads = [threading.Thread(target=request) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        deadline = time.monotonic() + 5
+        while cache.coalesced < 4 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, ["shared"] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.coalesced, 4)
+
+    def test_failures_are_not_cached(self):
+        cache = ChatResponseCache(FakeModelWithReply, "model-a")
+
+        def fail():
+            raise RuntimeError("upstream down")
+
+        with self.assertRaises(RuntimeError):
+            cache.get_or_generate("k", fail)
+        self.assertEqual(cache.get_or_generate("k", lambda: "ok"), "ok")
+
+
+class ChatStreamTests(TestCase):
+    def setUp(self):
+        self.previous_store = get_session_store()
+        self.store = InMemoryChatSessionStore(FakeModel, max_size=10, ttl=60)
+        set_session_store(self.store)
+        self.addCleanup(set_session_store, self.previous_store)
+
+    async def read_events(self, response):
+        body = b"".join([chunk async for chunk in response.streaming_content]).decode()
+        events = []
+        for block in body.strip().split("\n\n"):
+            event, data = block.split("\n")
+            events.append((event.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+        return events
+
+    async def test_streams_chunks_then_full_reply(self):
+        response = await self.async_client.post(
+            reverse("chat-stream"),
+            {"user_id": "u1", "message": "hi"},
+            content_type="application/json",
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        events = await self.read_events(response)
+
+        self.assertEqual([e for e, _ in events], ["chunk", "chunk", "chunk", "done"])
+        self.assertEqual("".join(d["text"] for _, d in events[:-1]), "echo hi (1) ")
+        self.assertEqual(events[-1][1]["response"], "echo hi (1) ")
+        self.assertEqual(len(self.store.get_chat("anon:u1").history), 2)
+
+    async def test_upstream_failure_is_reported_as_event(self):
+        def fail(message, **kwargs):
+            raise RuntimeError("quota exceeded")
+
+        self.store.get_chat("anon:u1").send_message = fail
+        response = await self.async_client.post(
+            reverse("chat-stream"),
+            {"user_id": "u1", "message": "hi"},
+            content_type="application/json",
+        )
+        with self.assertLogs("Chat.views", "ERROR") as logs:
+            events = await self.read_events(response)
+        self.assertEqual(events, [("error", {"error": "quota exceeded"})])
+        self.assertIn("RuntimeError: quota exceeded", logs.output[0])
+
+    async def test_requires_message(self):
+        response = await self.async_client.post(
+            reverse("chat-stream"), {"message": ""}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class ChatTaskContextTests(BaseAPITestCase):
+    def test_context_is_built_in_one_query(self):
+        collection_ids = [self.collection1.id, self.collection2.id]
+        with self.assertNumQueries(1):
+            block = build_task_context(collection_ids, timezone.localdate())
+        self.assertIn("Task 1 in Collection 1", block)
+        self.assertIn("note: Note 1 Title: Note 1 for Task 1", block)
+        self.assertIn("Task 2 in Collection 2", block)
+        self.assertLess(block.index("Task 1"), block.index("Task 2"))
+
+    def test_context_only_covers_accessible_collections(self):
+        block = get_task_context(self.user1)
+        self.assertIn("Task 1 in Collection 1", block)
+        self.assertNotIn("Task 2", block)
+
+    def test_context_is_cached_until_tasks_change(self):
+        get_task_context(self.user2)
+        with self.assertNumQueries(1):  # only the collection ids
+            get_task_context(self.user2)
+
+        self.task1.title = "Renamed task"
+        self.task1.save()
+        self.assertIn("Renamed task", get_task_context(self.user2))
+
+        self.note2.content = "Updated note"
+        self.note2.save()
+        self.assertIn("Updated note", get_task_context(self.user2))
+
+    def test_moving_a_task_refreshes_both_collections(self):
+        self.assertIn("Task 1 in Collection 1", get_task_context(self.user2))
+
+        private = Collection.objects.create(title="Private", owner=self.user1)
+        self.client.force_authenticate(user=self.user1)
+        response = self.client.patch(
+            reverse("tasks-detail", args=[self.task1.id]), {"collection": private.id}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Task 1", get_task_context(self.user2))
+
+    @override_settings(CHAT_CONTEXT_TOKEN_BUDGET=40)
+    def test_context_respects_token_budget(self):
+        block = get_task_context(self.user2)
+        self.assertIn("Task 1 in Collection 1", block)
+        self.assertNotIn("Task 2", block)
+        self.assertIn("...and 1 more not shown", block)
+
+    def test_include_tasks_adds_context_to_prompt(self):
+        store = InMemoryChatSessionStore(FakeModel, max_size=10, ttl=60)
+        set_session_store(store)
+        self.addCleanup(set_session_store, None)
+
+        self.client.force_login(self.user1)
+        data = {"user_id": "u1", "message": "What is next?", "include_tasks": True}
+        response = self.client.post(reverse("chat_view"), data, format="json")
+        self.assertEqual(response.status_code, 200)
+        prompt = store.get_chat(f"user:{self.user1.pk}").history[0]["parts"][0]
+        self.assertIn("Task 1 in Collection 1", prompt)
+        self.assertTrue(prompt.endswith("What is next?"))
+
+    def test_signed_in_session_cannot_be_joined_by_id(self):
+        store = InMemoryChatSessionStore(FakeModel, max_size=10, ttl=60)
+        set_session_store(store)
+        self.addCleanup(set_session_store, None)
+
+        self.client.force_login(self.user1)
+        data = {"user_id": "shared", "message": "What is next?", "include_tasks": True}
+        self.client.post(reverse("chat_view"), data, format="json")
+
+        self.client.logout()
+        for user_id in ("shared", f"user:{self.user1.pk}", None):
+            body = {"message": "What did I ask?"}
+            if user_id:
+                body["user_id"] = user_id
+            self.client.post(reverse("chat_view"), body, format="json")
+        self.client.force_login(self.user2)
+        self.client.post(reverse("chat_view"), data, format="json")
+
+        user1_history = store.get_chat(f"user:{self.user1.pk}").history
+        self.assertEqual(len(user1_history), 2)
+        for session_id in ("anon:shared", f"anon:user:{self.user1.pk}", "anon:default"):
+            self.assertNotIn("Task 1", str(store.get_chat(session_id).history))
+
+    def test_include_tasks_requires_login(self):
+        data = {"message": "What is next?", "include_tasks": True}
+        response = self.client.post(reverse("chat_view"), data, format="json")
+        self.assertEqual(response.status_code, 401)
+
+
+class ChatLimitTests(TestCase):
+    def setUp(self):
+        self.previous_store = get_session_store()
+        set_session_store(InMemoryChatSessionStore(FakeModel, max_size=10, ttl=60))
+        self.addCleanup(set_session_store, self.previous_store)
+        self.limiter = ConcurrencyLimiter(max_total=2, max_per_key=1)
+        set_limiter(self.limiter)
+        self.addCleanup(set_limiter, None)
+
+    def post(self, url_name="chat_view"):
+        return self.client.post(
+            reverse(url_name), {"message": "hi"}, content_type="application/json"
+        )
+
+    def test_limiter_scopes(self):
+        self.limiter.acquire("a")
+        with self.assertRaises(LimitExceeded) as raised:
+            self.limiter.acquire("a")
+        self.assertEqual(raised.exception.scope, "user")
+        self.limiter.acquire("b")
+        with self.assertRaises(LimitExceeded) as raised:
+            self.limiter.acquire("c")
+        self.assertEqual(raised.exception.scope, "global")
+        self.limiter.release("a")
+        self.limiter.acquire("c")
+        self.assertEqual(self.limiter.stats()["rejected_user"], 1)
+
+    def test_saturated_user_gets_429(self):
+        self.limiter.acquire("127.0.0.1")
+        for url_name in ("chat_view", "chat-stream"):
+            response = self.post(url_name)
+            self.assertEqual(response.status_code, 429)
+            self.assertEqual(response["Retry-After"], "1")
+
+    def test_saturated_process_gets_503(self):
+        self.limiter.acquire("a")
+        self.limiter.acquire("b")
+        self.assertEqual(self.post().status_code, 503)
+
+    def test_slots_are_released(self):
+        self.assertEqual(self.post().status_code, 200)
+        self.assertEqual(self.post().status_code, 200)
+        self.assertEqual(self.limiter.active, 0)
+
+    async def test_unread_stream_holds_no_slot(self):
+        request = AsyncRequestFactory().post(
+            reverse("chat-stream"), {"message": "hi"}, content_type="application/json"
+        )
+        request.auser = lambda: sync_to_async(AnonymousUser)()
+        response = await chat_stream(request)  # client gone before the body starts
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.limiter.active, 0)
+
+    @override_settings(CHAT_UPSTREAM_TIMEOUT=0.05)
+    def test_slow_upstream_times_out(self):
+        timeouts = (
+            REGISTRY.get_sample_value(
+                "chat_upstream_duration_seconds_count", {"outcome": "timeout"}
+            )
+            or 0
+        )
+        chat = get_session_store().get_chat("anon:default")
+        chat.send_message = lambda message, **kwargs: time.sleep(0.5)
+        self.assertEqual(self.post().status_code, 504)
+        self.assertEqual(self.limiter.active, 0)
+        self.assertEqual(
+            REGISTRY.get_sample_value(
+                "chat_upstream_duration_seconds_count", {"outcome": "timeout"}
+            ),
+            timeouts + 1,
+        )
@@ -1,6 +1,8 @@
 from django.urls import path
-from .views import chat_with_assistant
+from .views import chat_session_stats, chat_stream, chat_with_assistant
 
 urlpatterns = [
     path("", chat_with_assistant, name="chat_view"),
+    path("stream/", chat_stream, name="chat-stream"),
+    path("stats/", chat_session_stats, name="chat-stats"),
 ]
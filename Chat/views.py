@@ -1,41 +1,235 @@
+import asyncio
+import json
+import logging
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
-import google.generativeai as genai
+from django.views.decorators.http import require_POST
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
-from decouple import config
 
-genai.configure(api_key=config("GOOGLE_API_KEY"))
+from life_tracker_backend.metrics import CHAT_UPSTREAM_LATENCY
+from notifications.stream import format_event
+from users.authentication import aget_request_user
+from .assistant import get_limiter, get_response_cache, get_session_store, iterate_in_thread
+from .context import with_task_context
+from .limits import LimitExceeded
 
-# Optional: Keep chat history in memory (you can store it in a DB instead)
-chat_history = {}
+logger = logging.getLogger(__name__)
 
+TASK_CONTEXT_LOGIN_REQUIRED = "Log in to include your tasks in the conversation"
+
+
+class ChatRequestError(Exception):
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.status = status
+
+
+def error_response(message, status):
+    return JsonResponse({"error": message}, status=status)
+
+
+LIMIT_MESSAGES = {
+    "user": "Too many chat requests in progress, try again shortly",
+    "global": "The assistant is busy, try again shortly",
+}
+
+
+def limit_response(exc):
+    # 429 tells one user to back off; 503 means the whole process is busy
+    response = error_response(LIMIT_MESSAGES[exc.scope], 429 if exc.scope == "user" else 503)
+    response["Retry-After"] = "1"
+    return response
+
+
+def session_key(user, requested_id):
+    """
+    Signed-in users always get their own session, whatever ``user_id`` says: their
+    history can hold their tasks and notes. Anonymous callers pick an id of their own,
+    namespaced so it can never reach a signed-in user's session.
+    """
+    if user.is_authenticated:
+        return f"user:{user.pk}"
+    return f"anon:{requested_id or 'default'}"
+
+
+async def parse_chat_request(request):
+    """
+    Read ``message``, ``user_id`` and the option flags from a JSON or form body and
+    build the prompt, adding the task context when ``include_tasks`` is set.
+    """
+    if request.content_type == "application/json":
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError:
+            raise ChatRequestError("Invalid JSON body", 400)
+    else:
+        data = request.POST.dict()
+
+    message = str(data.get("message", "")).strip()
+    if not message:
+        raise ChatRequestError("No message provided", 400)
+
+    user = await aget_request_user(request)
+    prompt = message
+    if data.get("include_tasks"):
+        if not user.is_authenticated:
+            raise ChatRequestError(TASK_CONTEXT_LOGIN_REQUIRED, 401)
+        prompt = await sync_to_async(with_task_context)(user, message)
+
+    # Concurrency is limited per account, or per address for anonymous callers
+    limit_key = user.pk if user.is_authenticated else request.META.get("REMOTE_ADDR")
+    return {
+        "session_id": session_key(user, data.get("user_id")),
+        "message": message,
+        "prompt": prompt,
+        "stateless": bool(data.get("stateless")),
+        "limit_key": limit_key,
+    }
 
-@api_view(["POST"])
-@permission_classes([AllowAny])
-def chat_with_assistant(request):
-    try:
-        user_id = request.data.get("user_id", "default")  # Track users if needed
-        message = request.data.get("message", "").strip()
 
-        if not message:
-            return Response({"error": "No message provided"}, status=400)
+async def upstream(func, *args, **kwargs):
+    """Run a blocking Gemini call in a worker thread, bounded by CHAT_UPSTREAM_TIMEOUT."""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        result = await asyncio.wait_for(
+            sync_to_async(func, thread_sensitive=False)(*args, **kwargs),
+            settings.CHAT_UPSTREAM_TIMEOUT,
+        )
+        outcome = "ok"
+        return result
+    except asyncio.TimeoutError:
+        outcome = "timeout"
+        raise
+    finally:
+        CHAT_UPSTREAM_LATENCY.labels(outcome).observe(time.perf_counter() - started)
 
-        # Use the gemini-2.0-flash model which is working with your API key
-        if user_id not in chat_history:
-            model = genai.GenerativeModel("gemini-2.0-flash")
-            chat = model.start_chat()
-            chat_history[user_id] = chat
-        else:
-            chat = chat_history[user_id]
 
-        response = chat.send_message(message)
+@csrf_exempt
+@require_POST
+async def chat_with_assistant(request):
+    """
+    Send one message to the assistant and return ``{"response"}``.
 
-        return Response({"response": response.text})
+    Async, so under ASGI the Gemini round trip does not hold a worker. Calls over
+    CHAT_MAX_CONCURRENT_PER_USER get 429, over CHAT_MAX_CONCURRENT 503, and upstream
+    calls slower than CHAT_UPSTREAM_TIMEOUT 504.
+    """
+    try:
+        chat_request = await parse_chat_request(request)
+    except ChatRequestError as e:
+        return error_response(str(e), e.status)
 
+    try:
+        with get_limiter().slot(chat_request["limit_key"]):
+            reply = await get_reply(chat_request)
+    except LimitExceeded as e:
+        return limit_response(e)
+    except asyncio.TimeoutError:
+        return error_response("The assistant took too long to answer", 504)
     except Exception as e:
-        import traceback
+        logger.exception("Gemini chat request failed")
+        return error_response(str(e), 500)
+
+    return JsonResponse({"response": reply})
+
+
+async def get_reply(chat_request):
+    prompt = chat_request["prompt"]
+
+    # One-off prompts carry no history, so identical ones can share a reply
+    if chat_request["stateless"]:
+        cache = get_response_cache()
+        if settings.CHAT_RESPONSE_CACHE_ENABLED:
+            return await upstream(cache.reply, prompt)
+        return await upstream(cache.generate, prompt)
+
+    # Sessions live in a bounded store (see CHAT_SESSION_* settings)
+    store = get_session_store()
+    session_id = chat_request["session_id"]
+    chat = await sync_to_async(store.get_chat)(session_id)
+    response = await upstream(
+        chat.send_message, prompt, request_options={"timeout": settings.CHAT_UPSTREAM_TIMEOUT}
+    )
+    await sync_to_async(store.record_turn)(session_id, chat_request["message"], response.text)
+    return response.text
+
+
+@csrf_exempt
+@require_POST
+async def chat_stream(request):
+    """
+    Same conversation as ``chat_with_assistant`` but streamed as Server-Sent Events.
+
+    Events: ``chunk`` (``{"text"}``, as each piece of the reply arrives), then either
+    ``done`` (``{"response"}``, the full reply) or ``error``. The blocking Gemini
+    iterator runs in a worker thread, so under ASGI one process serves many chats.
+    The same concurrency limits apply for as long as the stream is open. The slot is
+    taken when the body starts, so a stream that is never read never holds one.
+    """
+    try:
+        chat_request = await parse_chat_request(request)
+    except ChatRequestError as e:
+        return error_response(str(e), e.status)
+
+    limiter, limit_key = get_limiter(), chat_request["limit_key"]
+    try:
+        limiter.check(limit_key)  # answer 429/503 up front while the status can still change
+    except LimitExceeded as e:
+        return limit_response(e)
+
+    async def events():
+        store = get_session_store()
+        session_id = chat_request["session_id"]
+        timeout = settings.CHAT_UPSTREAM_TIMEOUT
+        parts = []
+        try:
+            limiter.acquire(limit_key)
+        except LimitExceeded as e:
+            # Another request took the last slot since the check above
+            yield format_event("error", {"error": LIMIT_MESSAGES[e.scope]})
+            return
+        try:
+            chat = await sync_to_async(store.get_chat)(session_id)
+            chunks = await upstream(
+                chat.send_message,
+                chat_request["prompt"],
+                stream=True,
+                request_options={"timeout": timeout},
+            )
+            async for chunk in iterate_in_thread(chunks, timeout=timeout):
+                parts.append(chunk.text)
+                yield format_event("chunk", {"text": chunk.text})
+            reply = "".join(parts)
+            await sync_to_async(store.record_turn)(session_id, chat_request["message"], reply)
+            yield format_event("done", {"response": reply})
+        except asyncio.TimeoutError:
+            yield format_event("error", {"error": "The assistant took too long to answer"})
+        except Exception as e:
+            logger.exception("Gemini chat stream failed")
+            yield format_event("error", {"error": str(e)})
+        finally:
+            limiter.release(limit_key)
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
 
-        print("=== Gemini Chat Error ===")
-        traceback.print_exc()
-        return Response({"error": str(e)}, status=500)
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def chat_session_stats(request):
+    return Response(
+        {
+            "sessions": get_session_store().stats(),
+            "responses": get_response_cache().stats(),
+            "limits": get_limiter().stats(),
+        }
+    )
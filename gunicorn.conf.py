@@ -0,0 +1,72 @@
+"""
+Gunicorn settings for production: ``gunicorn -c gunicorn.conf.py``.
+
+Serves the ASGI application through uvicorn workers, so the async chat and
+notification stream views run on an event loop. Every value can be overridden
+with the environment variable named next to it.
+
+The worker count defaults to (2 x cores) + 1 when CACHE_BACKEND names a shared
+cache ("file" or "redis"), and to 1 with the default per-process "locmem" cache,
+whose entries one worker cannot invalidate for the others. Some state stays per
+process whatever the cache: a notification reaches only the event streams
+connected to the worker that published it (other clients see it when they next
+poll), the chat concurrency limits apply per worker, and chat history is only
+shared with CHAT_SESSION_STORE=database.
+
+Prometheus metrics are aggregated across workers when PROMETHEUS_MULTIPROC_DIR
+is set: the directory is emptied when the server starts and each worker is
+marked dead when it exits.
+"""
+
+import multiprocessing
+import os
+import shutil
+
+from decouple import config
+
+# "uvicorn" runs the ASGI app (required for the SSE stream and async chat views);
+# "gthread" runs the WSGI app on threads, for deployments that only need the REST API
+server = os.environ.get("GUNICORN_SERVER", "uvicorn")
+if server == "gthread":
+    wsgi_app = "life_tracker_backend.wsgi:application"
+    worker_class = "gthread"
+    threads = int(os.environ.get("GUNICORN_THREADS", 4))
+else:
+    wsgi_app = "life_tracker_backend.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+
+bind = os.environ.get("GUNICORN_BIND", f"0.0.0.0:{os.environ.get('PORT', '8000')}")
+# (2 x cores) + 1 is gunicorn's recommended starting point; a single worker with the
+# locmem cache (see above). Read like the Django settings, so .env counts too.
+shared_cache = config("CACHE_BACKEND", default="locmem") != "locmem"
+default_workers = multiprocessing.cpu_count() * 2 + 1 if shared_cache else 1
+workers = int(os.environ.get("WEB_CONCURRENCY", default_workers))
+
+# Chat calls may legitimately take CHAT_UPSTREAM_TIMEOUT (30s) plus overhead
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 60))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+
+# Recycle workers now and then to cap slow memory growth
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 100))
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
+forwarded_allow_ips = os.environ.get("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+
+def on_starting(server):
+    # Samples left by a previous run would be added to this run's counters
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if directory:
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory)
+
+
+def child_exit(server, worker):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
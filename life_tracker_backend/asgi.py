@@ -3,6 +3,11 @@ ASGI config for life_tracker_backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Long-lived async views such as the notification event stream
+(/api/notifications/stream/) only work when served through this entry point.
+The chat endpoints (/api/chat/, /api/chat/stream/) are async too: under ASGI a
+Gemini round trip waits on the event loop instead of occupying a worker.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 """
@@ -0,0 +1,210 @@
+"""
+Prometheus metrics, served in the text exposition format at /api/metrics/.
+
+With several worker processes set PROMETHEUS_MULTIPROC_DIR to an empty, writable
+directory before the server starts: every process then writes its samples there
+and the endpoint aggregates them, whichever worker serves the scrape (see
+gunicorn.conf.py). Without it the endpoint reports the serving process only.
+"""
+
+import hmac
+import os
+import time
+from contextlib import asynccontextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.db.models import Count
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.permissions import BasePermission, IsAdminUser
+from rest_framework.settings import api_settings
+
+REQUESTS = Counter(
+    "http_requests_total",
+    "Requests by resolved URL name, method and status code.",
+    ["route", "method", "status"],
+)
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time spent producing the response, by resolved URL name.",
+    ["route", "method"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Database queries run per request, by resolved URL name.",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total",
+    "Cache lookups by cache and result (hit or miss).",
+    ["cache", "result"],
+)
+CHAT_UPSTREAM_LATENCY = Histogram(
+    "chat_upstream_duration_seconds",
+    "Gemini round trips by outcome (ok, timeout or error).",
+    ["outcome"],
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 15, 30, 60),
+)
+
+METRICS_TOKEN_AUTH = "metrics-token"
+
+
+def record_cache_lookup(cache, hit):
+    CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss").inc()
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def _install_wrapper(wrapper):
+    connection.execute_wrappers.append(wrapper)
+
+
+def _remove_wrapper(wrapper):
+    connection.execute_wrappers.remove(wrapper)
+
+
+@asynccontextmanager
+async def async_execute_wrapper(wrapper):
+    """
+    connection.execute_wrapper() for async middleware. Under ASGI a request's sync
+    views and sync_to_async ORM calls run on one executor thread with its own
+    connection, so the wrapper is installed there instead of on the event loop's.
+    """
+    await sync_to_async(_install_wrapper)(wrapper)
+    try:
+        yield
+    finally:
+        await sync_to_async(_remove_wrapper)(wrapper)
+
+
+class MetricsMiddleware:
+    """
+    Counts and times every request under its URL name rather than its path, so
+    ``/api/collections/12/tasks/`` and ``/api/collections/13/tasks/`` share one
+    series. Unresolved paths are reported as ``unmatched``. Turned off with
+    METRICS_ENABLED=False.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        # Stay on the event loop under ASGI instead of forcing the chain onto a thread
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        queries = QueryCounter()
+        started = time.perf_counter()
+        with connection.execute_wrapper(queries):
+            response = self.get_response(request)
+        return self.record(request, response, queries, started)
+
+    async def __acall__(self, request):
+        queries = QueryCounter()
+        started = time.perf_counter()
+        async with async_execute_wrapper(queries):
+            response = await self.get_response(request)
+        return self.record(request, response, queries, started)
+
+    def record(self, request, response, queries, started):
+        duration = time.perf_counter() - started
+        match = getattr(request, "resolver_match", None)
+        route = match.view_name if match else "unmatched"
+        REQUESTS.labels(route, request.method, response.status_code).inc()
+        REQUEST_LATENCY.labels(route, request.method).observe(duration)
+        REQUEST_QUERIES.labels(route).observe(queries.count)
+        return response
+
+
+class EmailOutboxCollector:
+    """Outbox depth by status, read from the database at scrape time."""
+
+    STATUSES = ("pending", "sending", "failed")
+
+    def collect(self):
+        from users.models import OutgoingEmail
+
+        depth = dict(
+            OutgoingEmail.objects.filter(status__in=self.STATUSES)
+            .values("status")
+            .annotate(count=Count("id"))
+            .values_list("status", "count")
+        )
+        gauge = GaugeMetricFamily(
+            "email_outbox_depth", "Emails in the outbox by status.", labels=["status"]
+        )
+        for status in self.STATUSES:
+            gauge.add_metric([status], depth.get(status, 0))
+        yield gauge
+
+
+class _ProcessCollector:
+    """This process's metrics from the global registry."""
+
+    def collect(self):
+        return REGISTRY.collect()
+
+
+def build_registry():
+    registry = CollectorRegistry()
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry.register(_ProcessCollector())
+    registry.register(EmailOutboxCollector())
+    return registry
+
+
+class MetricsTokenAuthentication(BaseAuthentication):
+    """Accepts ``Authorization: Bearer <METRICS_TOKEN>``, as sent by a Prometheus scraper."""
+
+    def authenticate(self, request):
+        token = settings.METRICS_TOKEN
+        header = request.META.get("HTTP_AUTHORIZATION", "")
+        if token and hmac.compare_digest(header.encode(), f"Bearer {token}".encode()):
+            return AnonymousUser(), METRICS_TOKEN_AUTH
+        return None
+
+
+class HasMetricsToken(BasePermission):
+    def has_permission(self, request, view):
+        return request.auth == METRICS_TOKEN_AUTH
+
+
+@api_view(["GET"])
+@authentication_classes([MetricsTokenAuthentication, *api_settings.DEFAULT_AUTHENTICATION_CLASSES])
+@permission_classes([HasMetricsToken | IsAdminUser])
+def metrics_view(request):
+    """Prometheus text exposition, for the METRICS_TOKEN bearer or a staff user."""
+    return HttpResponse(generate_latest(build_registry()), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,120 @@
+import base64
+import json
+from datetime import date, datetime, time
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opt-in keyset (cursor) pagination.
+
+    Pagination only kicks in when the client sends ``cursor`` or ``page_size``, so
+    existing clients that expect a plain list keep working. Pages are fetched with a
+    ``WHERE (a, b) > (last_a, last_b)`` style filter on ``ordering`` instead of an
+    OFFSET, so every page costs the same no matter how deep the client scrolls. The
+    last ordering field must be unique (normally ``id``).
+    """
+
+    ordering = ("id",)
+    page_size = 50
+    max_page_size = 500
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        encoded = params.get(self.cursor_query_param)
+        if encoded:
+            values = self.decode_cursor(encoded, queryset.model)
+            queryset = queryset.filter(self._after(values))
+
+        rows = list(queryset[: page_size + 1])
+        self.has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        self.last_values = (
+            [getattr(rows[-1], name.lstrip("-")) for name in self.ordering] if rows else None
+        )
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.last_values)
+        )
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def encode_cursor(self, values):
+        values = [v.isoformat() if isinstance(v, (date, datetime, time)) else v for v in values]
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def decode_cursor(self, encoded, model):
+        """
+        Decode a cursor into one value per ordering field of ``model``. Cursors come
+        from the client, so each value is converted with its field's ``to_python``
+        and anything that does not convert is rejected.
+        """
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        converted = []
+        for name, value in zip(self.ordering, values):
+            field = model._meta.get_field(name.lstrip("-"))
+            try:
+                value = field.to_python(value)
+            except (ValidationError, TypeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+            if value is None:
+                raise NotFound(self.invalid_cursor_message)
+            converted.append(value)
+        return converted
+
+    def _after(self, values):
+        # (a, b, c) > (x, y, z)  ==  a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z)
+        condition = Q()
+        for index, name in enumerate(self.ordering):
+            field = name.lstrip("-")
+            lookup = "lt" if name.startswith("-") else "gt"
+            equal = {
+                prev.lstrip("-"): value
+                for prev, value in zip(self.ordering[:index], values[:index])
+            }
+            condition |= Q(**equal, **{f"{field}__{lookup}": values[index]})
+        return condition
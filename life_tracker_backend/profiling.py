@@ -0,0 +1,133 @@
+import heapq
+import json
+import logging
+import random
+import threading
+import time
+from collections import deque
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from .metrics import async_execute_wrapper
+
+logger = logging.getLogger(__name__)
+
+# Most recent slow requests, newest last. Per process.
+slow_requests = deque(maxlen=settings.SQL_PROFILING_BUFFER_SIZE)
+_buffer_lock = threading.Lock()
+
+MAX_SQL_LENGTH = 500
+
+
+class QueryProfile:
+    """execute_wrapper that times every statement and keeps the slowest few."""
+
+    def __init__(self, keep):
+        self.keep = keep
+        self.count = 0
+        self.total = 0.0
+        self._slowest = []  # min-heap of (seconds, sequence, sql)
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.count += 1
+            self.total += duration
+            # Statements only: parameters can hold personal data
+            entry = (duration, self.count, sql[:MAX_SQL_LENGTH])
+            if len(self._slowest) < self.keep:
+                heapq.heappush(self._slowest, entry)
+            else:
+                heapq.heappushpop(self._slowest, entry)
+
+    def slowest(self):
+        return [
+            {"sql": sql, "ms": round(duration * 1000, 2)}
+            for duration, _, sql in sorted(self._slowest, reverse=True)
+        ]
+
+
+class SQLProfilingMiddleware:
+    """
+    Opt-in (SQL_PROFILING_ENABLED) per-request database profiling.
+
+    Adds ``Server-Timing: db;dur=..., app;dur=...`` to every response and logs one
+    JSON line per request. Requests slower than SQL_PROFILING_SLOW_MS are sampled
+    (SQL_PROFILING_SAMPLE_RATE) into a ring buffer served by ``slow_request_log``.
+    Only queries run on the request's own thread (under ASGI, its executor thread)
+    are seen.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.SQL_PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        profile = QueryProfile(settings.SQL_PROFILING_TOP_QUERIES)
+        started = time.perf_counter()
+        with connection.execute_wrapper(profile):
+            response = self.get_response(request)
+        return self.record(request, response, profile, started)
+
+    async def __acall__(self, request):
+        profile = QueryProfile(settings.SQL_PROFILING_TOP_QUERIES)
+        started = time.perf_counter()
+        async with async_execute_wrapper(profile):
+            response = await self.get_response(request)
+        return self.record(request, response, profile, started)
+
+    def record(self, request, response, profile, started):
+        duration_ms = (time.perf_counter() - started) * 1000
+        db_ms = profile.total * 1000
+
+        response["Server-Timing"] = (
+            f'db;dur={db_ms:.1f};desc="{profile.count} queries", app;dur={duration_ms:.1f}'
+        )
+        match = getattr(request, "resolver_match", None)
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "route": match.view_name if match else None,
+            "status": response.status_code,
+            "duration_ms": round(duration_ms, 2),
+            "db_ms": round(db_ms, 2),
+            "queries": profile.count,
+            "slowest": profile.slowest(),
+        }
+        logger.info(json.dumps(record))
+
+        if (
+            duration_ms >= settings.SQL_PROFILING_SLOW_MS
+            and random.random() < settings.SQL_PROFILING_SAMPLE_RATE
+        ):
+            record["at"] = time.time()
+            with _buffer_lock:
+                slow_requests.append(record)
+        return response
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def slow_request_log(request):
+    """Sampled slow requests recorded by this process, newest first."""
+    with _buffer_lock:
+        records = list(slow_requests)
+    return Response({"results": records[::-1]})
@@ -62,6 +62,13 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    # Serves collected static files (hashed names, gzip/brotli) without runserver;
+    # WhiteNoise with an async path, so the chain stays on the event loop under ASGI
+    "life_tracker_backend.static.StaticFilesMiddleware",
+    # Request count, latency and query histograms for /api/metrics/
+    "life_tracker_backend.metrics.MetricsMiddleware",
+    # Disabled unless SQL_PROFILING_ENABLED is set
+    "life_tracker_backend.profiling.SQLProfilingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -95,18 +102,96 @@ WSGI_APPLICATION = "life_tracker_backend.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
+# DATABASE_ENGINE is "sqlite" (default, single node) or "postgresql".
+DATABASE_ENGINE = config("DATABASE_ENGINE", default="sqlite")
+
+if DATABASE_ENGINE == "postgresql":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": config("DATABASE_NAME"),
+            "USER": config("DATABASE_USER"),
+            "PASSWORD": config("DATABASE_PASSWORD"),
+            "HOST": config("DATABASE_HOST", default="localhost"),
+            "PORT": config("DATABASE_PORT", default="5432"),
+            # Reuse connections across requests; check them before reuse
+            "CONN_MAX_AGE": config("DATABASE_CONN_MAX_AGE", default=60, cast=int),
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {},
+        }
+    }
+    # psycopg 3 connection pool, shared by the threads of a process
+    if config("DATABASE_POOL", default=False, cast=bool):
+        DATABASES["default"]["CONN_MAX_AGE"] = 0  # pooling replaces persistent connections
+        DATABASES["default"]["OPTIONS"]["pool"] = {
+            "min_size": config("DATABASE_POOL_MIN_SIZE", default=2, cast=int),
+            "max_size": config("DATABASE_POOL_MAX_SIZE", default=10, cast=int),
+            "timeout": config("DATABASE_POOL_TIMEOUT", default=10, cast=int),
+        }
+else:
+    # Run on every new connection (Django's init_command hook)
+    SQLITE_PRAGMAS = {
+        # Readers keep going while a write is in progress
+        "journal_mode": "WAL",
+        # Safe with WAL: a power loss can drop the last commits but not corrupt the file
+        "synchronous": "NORMAL",
+        # Negative values are KiB: page cache per connection
+        "cache_size": -config("SQLITE_CACHE_SIZE_KB", default=65536, cast=int),
+        "mmap_size": config("SQLITE_MMAP_SIZE", default=268435456, cast=int),
+        "temp_store": "MEMORY",
+    }
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": config("SQLITE_PATH", default=str(BASE_DIR / "db.sqlite3")),
+            "CONN_MAX_AGE": config("DATABASE_CONN_MAX_AGE", default=60, cast=int),
+            "CONN_HEALTH_CHECKS": True,
+            # A file rather than shared-cache memory, so tests that use several threads
+            # get the same WAL locking as production instead of "table is locked" errors
+            "TEST": {"NAME": str(BASE_DIR / "test_db.sqlite3")},
+            "OPTIONS": {
+                "init_command": "".join(
+                    f"PRAGMA {name}={value};" for name, value in SQLITE_PRAGMAS.items()
+                ),
+                # Busy timeout: seconds a writer waits for the lock before "database is locked"
+                "timeout": config("SQLITE_TIMEOUT", default=20, cast=int),
+                # Take the write lock at BEGIN, so a transaction that reads and then writes
+                # waits for the busy timeout instead of failing when another writer got in first
+                "transaction_mode": "IMMEDIATE",
+            },
+        }
+    }
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# CACHE_BACKEND is one of "locmem" (default, per process), "file" or "redis".
+
+CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "redis": "django.core.cache.backends.redis.RedisCache",
+}
+CACHE_BACKEND = config("CACHE_BACKEND", default="locmem")
+CACHES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
-        # "ENGINE": "django.db.backends.postgresql",
-        # "NAME": config("DATABASE_NAME"),
-        # "USER": config("DATABASE_USER"),
-        # "PASSWORD": config("DATABASE_PASSWORD"),
-        # "HOST": config("DATABASE_HOST"),
-        # "PORT": config("DATABASE_PORT"),
+        "BACKEND": CACHE_BACKENDS[CACHE_BACKEND],
+        "LOCATION": config(
+            "CACHE_LOCATION",
+            default=str(BASE_DIR / "cache") if CACHE_BACKEND == "file" else "planora",
+        ),
     }
 }
+# Whether all worker processes see one cache, so an entry deleted by one is gone for all
+SHARED_CACHE = CACHE_BACKEND != "locmem"
+# Web server processes; gunicorn.conf.py runs a single one with the locmem cache
+WEB_CONCURRENCY = config("WEB_CONCURRENCY", default=1, cast=int)
+# Seconds a cached collection/share-link response may be served before it is rebuilt;
+# 0 turns response caching off. Off by default only for several workers on locmem,
+# where an edit in one worker cannot invalidate the copies cached by the others.
+RESPONSE_CACHE_TIMEOUT = config(
+    "RESPONSE_CACHE_TIMEOUT", default=300 if SHARED_CACHE or WEB_CONCURRENCY == 1 else 0, cast=int
+)
 
 
 # Password validation
@@ -146,6 +231,15 @@ USE_TZ = True
 STATIC_URL = "/static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 STATICFILES_DIRS = [BASE_DIR / "static"]
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": config(
+            "STATICFILES_BACKEND",
+            default="whitenoise.storage.CompressedManifestStaticFilesStorage",
+        )
+    },
+}
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
@@ -163,19 +257,92 @@ EMAIL_HOST_USER = config("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = config("EMAIL_HOST_PASSWORD")
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
 
+# Outgoing emails are queued in the database and delivered by
+# `python manage.py send_queued_emails`, which scripts/start.sh runs next to gunicorn.
+# Disable to deliver inside the request, raising SMTP errors to the caller.
+EMAIL_OUTBOX_ENABLED = config("EMAIL_OUTBOX_ENABLED", default=True, cast=bool)
+EMAIL_OUTBOX_MAX_ATTEMPTS = config("EMAIL_OUTBOX_MAX_ATTEMPTS", default=5, cast=int)
+# Seconds before the first retry; doubled after every failed attempt
+EMAIL_OUTBOX_RETRY_DELAY = config("EMAIL_OUTBOX_RETRY_DELAY", default=60, cast=int)
+# Seconds after which a batch claimed by a crashed worker is picked up again
+EMAIL_OUTBOX_CLAIM_TIMEOUT = config("EMAIL_OUTBOX_CLAIM_TIMEOUT", default=600, cast=int)
+
 # Custom user model
 AUTH_USER_MODEL = "users.User"
 
 
 REST_FRAMEWORK = {
+    # JWT first: it is what the frontend sends on every request
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "users.authentication.CachedJWTAuthentication",
         "rest_framework.authentication.SessionAuthentication",
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "rest_framework.authentication.TokenAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": ["rest_framework.permissions.AllowAny"],
 }
 
+# Where JWT requests get request.user from: "database" (a query per request), "cache"
+# (cached for JWT_USER_CACHE_TIMEOUT seconds, cleared when the user is saved or deleted)
+# or "claims" (built from the token, no query; deactivation applies at token expiry).
+# "cache" is the default only with a shared cache: with locmem, a user deactivated or
+# edited in one worker would stay cached in the others.
+JWT_USER_SOURCE = config("JWT_USER_SOURCE", default="cache" if SHARED_CACHE else "database")
+JWT_USER_CACHE_TIMEOUT = config("JWT_USER_CACHE_TIMEOUT", default=60, cast=int)
+
+# Seconds between keep-alive comments on the notification event stream
+NOTIFICATION_STREAM_KEEPALIVE = config("NOTIFICATION_STREAM_KEEPALIVE", default=15, cast=int)
+
+# Per-request SQL profiling: Server-Timing headers, one JSON log line per request and
+# a ring buffer of slow requests at /api/profiling/slow-requests/ (staff only)
+SQL_PROFILING_ENABLED = config("SQL_PROFILING_ENABLED", default=False, cast=bool)
+SQL_PROFILING_SLOW_MS = config("SQL_PROFILING_SLOW_MS", default=500, cast=float)
+SQL_PROFILING_SAMPLE_RATE = config("SQL_PROFILING_SAMPLE_RATE", default=1.0, cast=float)
+SQL_PROFILING_BUFFER_SIZE = config("SQL_PROFILING_BUFFER_SIZE", default=100, cast=int)
+SQL_PROFILING_TOP_QUERIES = config("SQL_PROFILING_TOP_QUERIES", default=5, cast=int)
+
+# Prometheus metrics at /api/metrics/, readable by staff users or a scraper sending
+# "Authorization: Bearer <METRICS_TOKEN>". Set PROMETHEUS_MULTIPROC_DIR with several workers.
+METRICS_ENABLED = config("METRICS_ENABLED", default=True, cast=bool)
+METRICS_TOKEN = config("METRICS_TOKEN", default="")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        "life_tracker_backend.profiling": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
+    },
+}
+
+# Gemini assistant
+CHAT_MODEL_NAME = config("CHAT_MODEL_NAME", default="gemini-2.0-flash")
+# "memory" keeps sessions per process; "database" persists turns and rebuilds on a miss
+CHAT_SESSION_STORE = config("CHAT_SESSION_STORE", default="memory")
+CHAT_SESSION_MAX_SIZE = config("CHAT_SESSION_MAX_SIZE", default=1000, cast=int)
+CHAT_SESSION_TTL = config("CHAT_SESSION_TTL", default=3600, cast=int)
+CHAT_HISTORY_MAX_TURNS = config("CHAT_HISTORY_MAX_TURNS", default=50, cast=int)
+# Exact-match cache for {"stateless": true} prompts
+CHAT_RESPONSE_CACHE_ENABLED = config("CHAT_RESPONSE_CACHE_ENABLED", default=True, cast=bool)
+CHAT_RESPONSE_CACHE_SIZE = config("CHAT_RESPONSE_CACHE_SIZE", default=500, cast=int)
+CHAT_RESPONSE_CACHE_TTL = config("CHAT_RESPONSE_CACHE_TTL", default=3600, cast=int)
+# In-flight Gemini calls allowed per process and per user, and seconds to wait for one
+CHAT_MAX_CONCURRENT = config("CHAT_MAX_CONCURRENT", default=32, cast=int)
+CHAT_MAX_CONCURRENT_PER_USER = config("CHAT_MAX_CONCURRENT_PER_USER", default=2, cast=int)
+CHAT_UPSTREAM_TIMEOUT = config("CHAT_UPSTREAM_TIMEOUT", default=30, cast=int)
+# Task context block added to prompts with {"include_tasks": true}
+CHAT_CONTEXT_DAYS = config("CHAT_CONTEXT_DAYS", default=14, cast=int)
+CHAT_CONTEXT_TOKEN_BUDGET = config("CHAT_CONTEXT_TOKEN_BUDGET", default=800, cast=int)
+CHAT_CONTEXT_MAX_ROWS = config("CHAT_CONTEXT_MAX_ROWS", default=200, cast=int)
+CHAT_CONTEXT_NOTE_CHARS = config("CHAT_CONTEXT_NOTE_CHARS", default=160, cast=int)
+CHAT_CONTEXT_CACHE_TIMEOUT = config("CHAT_CONTEXT_CACHE_TIMEOUT", default=3600, cast=int)
+
+# Read notifications older than this many days are moved out by archive_notifications
+NOTIFICATION_RETENTION_DAYS = config("NOTIFICATION_RETENTION_DAYS", default=90, cast=int)
+
 CORS_ALLOW_CREDENTIALS = True
 
 CORS_ALLOWED_ORIGINS = config(
@@ -209,7 +376,8 @@ SIMPLE_JWT = {
     "TOKEN_TYPE_CLAIM": "token_type",
     "JTI_CLAIM": "jti",
     "TOKEN_OBTAIN_SERIALIZER": "rest_framework_simplejwt.serializers.TokenObtainPairSerializer",
-    "TOKEN_REFRESH_SERIALIZER": "rest_framework_simplejwt.serializers.TokenRefreshSerializer",
+    # Reloads the username and staff claims of access tokens from the user
+    "TOKEN_REFRESH_SERIALIZER": "users.authentication.UserTokenRefreshSerializer",
     "TOKEN_VERIFY_SERIALIZER": "rest_framework_simplejwt.serializers.TokenVerifySerializer",
 }
 
@@ -0,0 +1,157 @@
+import json
+
+from django.core.handlers.asgi import ASGIHandler
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.models import OutgoingEmail
+from users.tests import BaseAPITestCase
+from . import profiling
+from .static import StaticFilesMiddleware
+
+
+@override_settings(SQL_PROFILING_ENABLED=True, SQL_PROFILING_SLOW_MS=0)
+class SQLProfilingMiddlewareTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        profiling.slow_requests.clear()
+        self.client.force_authenticate(user=self.user1)
+
+    def test_adds_server_timing_and_logs_request(self):
+        with self.assertLogs("life_tracker_backend.profiling", "INFO") as logs:
+            response = self.client.get(reverse("tasks-list"))
+
+        self.assertRegex(
+            response["Server-Timing"], r'^db;dur=[\d.]+;desc="\d+ queries", app;dur=[\d.]+$'
+        )
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record["route"], "tasks-list")
+        self.assertGreater(record["queries"], 0)
+        self.assertLessEqual(len(record["slowest"]), 5)
+        self.assertIn("SELECT", record["slowest"][0]["sql"])
+
+    def test_slow_requests_are_kept_for_staff(self):
+        with self.assertLogs("life_tracker_backend.profiling", "INFO"):
+            self.client.get(reverse("tasks-list"))
+            response = self.client.get(reverse("slow-requests"))
+            self.assertEqual(response.status_code, 403)
+
+            self.user1.is_staff = True
+            self.user1.save()
+            response = self.client.get(reverse("slow-requests"))
+        routes = [record["route"] for record in response.data["results"]]
+        self.assertEqual(routes[-1], "tasks-list")
+
+    @override_settings(SQL_PROFILING_SLOW_MS=60_000)
+    def test_fast_requests_are_not_buffered(self):
+        with self.assertLogs("life_tracker_backend.profiling", "INFO"):
+            self.client.get(reverse("tasks-list"))
+        self.assertEqual(len(profiling.slow_requests), 0)
+
+    async def test_profiles_queries_under_asgi(self):
+        token = str(AccessToken.for_user(self.user1))
+
+        with self.assertLogs("life_tracker_backend.profiling", "INFO") as logs:
+            response = await self.async_client.get(
+                reverse("tasks-list"), headers={"authorization": f"Bearer {token}"}
+            )
+
+        self.assertRegex(response["Server-Timing"], r'desc="[1-9]\d* queries"')
+        self.assertGreater(json.loads(logs.records[0].getMessage())["queries"], 0)
+
+
+@override_settings(SQL_PROFILING_ENABLED=True)
+class AsyncMiddlewareTests(BaseAPITestCase):
+    def test_asgi_chain_is_not_adapted_to_sync(self):
+        # With DEBUG on, Django logs every adaptation it makes while building the chain
+        with self.settings(DEBUG=True), self.assertNoLogs("django.request", "DEBUG"):
+            ASGIHandler().load_middleware(is_async=True)
+
+    @override_settings(WHITENOISE_AUTOREFRESH=True)
+    async def test_static_files_are_served_on_the_event_loop(self):
+        async def get_response(request):
+            return HttpResponse("view")
+
+        middleware = StaticFilesMiddleware(get_response)
+        factory = RequestFactory()
+
+        response = await middleware(factory.get("/static/img/planora-logo-white.png"))
+        self.assertEqual(response["Content-Type"], "image/png")
+        response = await middleware(factory.get("/api/tasks/"))
+        self.assertEqual(response.content, b"view")
+
+
+class SQLProfilingDisabledTests(BaseAPITestCase):
+    def test_no_header_when_disabled(self):
+        self.client.force_authenticate(user=self.user1)
+        response = self.client.get(reverse("tasks-list"))
+        self.assertNotIn("Server-Timing", response)
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@override_settings(METRICS_TOKEN="scrape-secret")
+class MetricsTests(BaseAPITestCase):
+    def test_requests_are_counted_by_url_name(self):
+        self.client.force_authenticate(user=self.user1)
+        labels = {"route": "tasks-list", "method": "GET"}
+        before = sample("http_requests_total", status="200", **labels)
+        queries_before = sample("http_request_db_queries_sum", route="tasks-list")
+
+        self.client.get(reverse("tasks-list"))
+
+        self.assertEqual(sample("http_requests_total", status="200", **labels), before + 1)
+        self.assertGreater(sample("http_request_duration_seconds_count", **labels), 0)
+        queries = sample("http_request_db_queries_sum", route="tasks-list")
+        self.assertGreater(queries, queries_before)
+
+    async def test_queries_are_counted_under_asgi(self):
+        token = str(AccessToken.for_user(self.user1))
+        queries_before = sample("http_request_db_queries_sum", route="tasks-list")
+
+        response = await self.async_client.get(
+            reverse("tasks-list"), headers={"authorization": f"Bearer {token}"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        queries = sample("http_request_db_queries_sum", route="tasks-list")
+        self.assertGreater(queries, queries_before)
+
+    @override_settings(RESPONSE_CACHE_TIMEOUT=300)
+    def test_cache_hits_and_misses(self):
+        self.client.force_authenticate(user=self.user1)
+        hits = sample("cache_lookups_total", cache="response", result="hit")
+        misses = sample("cache_lookups_total", cache="response", result="miss")
+
+        self.client.get(reverse("pages-list"))
+        self.client.get(reverse("pages-list"))
+
+        self.assertEqual(sample("cache_lookups_total", cache="response", result="miss"), misses + 1)
+        self.assertEqual(sample("cache_lookups_total", cache="response", result="hit"), hits + 1)
+
+    def test_endpoint_requires_token_or_staff(self):
+        url = reverse("metrics")
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.force_authenticate(user=self.user1)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.user1.is_staff = True
+        self.user1.save()
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_scraper_token_and_outbox_depth(self):
+        OutgoingEmail.objects.create(subject="s", body="b", from_email="a@example.com")
+
+        response = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer scrape-secret")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        body = response.content.decode()
+        self.assertIn('email_outbox_depth{status="pending"} 1.0', body)
+        self.assertIn("http_requests_total{", body)
@@ -2,6 +2,8 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from .metrics import metrics_view
+from .profiling import slow_request_log
 from .swagger import swagger_urlpatterns
 
 urlpatterns = [
@@ -12,6 +14,8 @@ urlpatterns = [
     path("api/notifications/", include("notifications.urls")),
     path("api/tasks/", include("tasks.urls")),
     path("api/chat/", include("Chat.urls")),
+    path("api/profiling/slow-requests/", slow_request_log, name="slow-requests"),
+    path("api/metrics/", metrics_view, name="metrics"),
 ]
 
 # Add Swagger URL patterns
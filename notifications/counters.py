@@ -0,0 +1,71 @@
+from collections import Counter
+
+from django.db.models import Count, F, Value
+from django.db.models.functions import Greatest
+
+from .models import Notification, UnreadNotificationCounter
+
+
+def get_unread_count(user_id):
+    return (
+        UnreadNotificationCounter.objects.filter(user_id=user_id)
+        .values_list("unread_count", flat=True)
+        .first()
+        or 0
+    )
+
+
+def increment_unread(user_ids):
+    """Add one per occurrence of each user id, in a fixed number of queries."""
+    amounts = Counter(user_ids)
+    if not amounts:
+        return
+    UnreadNotificationCounter.objects.bulk_create(
+        [UnreadNotificationCounter(user_id=user_id) for user_id in amounts],
+        ignore_conflicts=True,
+    )
+    by_amount = {}
+    for user_id, amount in amounts.items():
+        by_amount.setdefault(amount, []).append(user_id)
+    for amount, ids in by_amount.items():
+        UnreadNotificationCounter.objects.filter(user_id__in=ids).update(
+            unread_count=F("unread_count") + amount
+        )
+
+
+def decrement_unread(user_id, amount=1):
+    if amount > 0:
+        UnreadNotificationCounter.objects.filter(user_id=user_id).update(
+            unread_count=Greatest(F("unread_count") - amount, Value(0))
+        )
+
+
+def reconcile_counters():
+    """
+    Recompute every counter from the Notification table. Returns the number of
+    counters whose stored value was wrong.
+    """
+    actual = dict(
+        Notification.objects.filter(is_read=False)
+        .values("recipient_id")
+        .annotate(unread=Count("id"))
+        .values_list("recipient_id", "unread")
+    )
+    stored = dict(UnreadNotificationCounter.objects.values_list("user_id", "unread_count"))
+
+    wrong = {
+        user_id: actual.get(user_id, 0)
+        for user_id in set(actual) | set(stored)
+        if actual.get(user_id, 0) != stored.get(user_id, 0)
+    }
+    UnreadNotificationCounter.objects.bulk_create(
+        [
+            UnreadNotificationCounter(user_id=user_id, unread_count=count)
+            for user_id, count in wrong.items()
+        ],
+        update_conflicts=True,
+        unique_fields=["user"],
+        update_fields=["unread_count"],
+        batch_size=1000,
+    )
+    return len(wrong)
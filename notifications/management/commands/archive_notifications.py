@@ -0,0 +1,49 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from notifications.retention import archive_read_notifications, collapse_share_notifications
+
+
+class Command(BaseCommand):
+    help = (
+        "Collapses repeated page-share notifications and archives old read notifications "
+        "into the archive table or a JSON-lines file"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than-days",
+            type=int,
+            default=settings.NOTIFICATION_RETENTION_DAYS,
+            help="Archive read notifications older than this many days",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--output", help="Append archived rows to this JSON-lines file instead of the table"
+        )
+        parser.add_argument(
+            "--skip-collapse", action="store_true", help="Do not merge page-share notifications"
+        )
+
+    def handle(self, *args, **options):
+        if not options["skip_collapse"]:
+            removed, groups = collapse_share_notifications(batch_size=options["batch_size"])
+            self.stdout.write(
+                f"Collapsed {removed} share notifications into {groups} aggregated entries."
+            )
+
+        cutoff = timezone.now() - timedelta(days=options["older_than_days"])
+        if options["output"]:
+            with open(options["output"], "a", encoding="utf-8") as output:
+                archived = archive_read_notifications(cutoff, options["batch_size"], output)
+            destination = options["output"]
+        else:
+            archived = archive_read_notifications(cutoff, options["batch_size"])
+            destination = "the archive table"
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Archived {archived} read notifications to {destination}.")
+        )
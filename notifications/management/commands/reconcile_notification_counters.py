@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from notifications.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = "Recomputes every user's unread notification counter from the notifications table"
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            repaired = reconcile_counters()
+        self.stdout.write(self.style.SUCCESS(f"Repaired {repaired} unread counters."))
@@ -0,0 +1,27 @@
+# Generated by Django 5.2 on 2026-10-18 22:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0002_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["recipient", "is_read", "timestamp"], name="notificatio_recipie_032eae_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["recipient", "-timestamp", "-id"], name="notificatio_recipie_f6c878_idx"
+            ),
+        ),
+    ]
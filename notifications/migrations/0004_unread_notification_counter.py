@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2026-10-18 22:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0003_notification_inbox_index"),
+        ("users", "0002_outgoing_email"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UnreadNotificationCounter",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="notification_counter",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("unread_count", models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations
+from django.db.models import Count
+
+
+def backfill_unread_counters(apps, schema_editor):
+    """Seed each user's counter from their unread notifications, as reconcile_counters does."""
+    Notification = apps.get_model("notifications", "Notification")
+    UnreadNotificationCounter = apps.get_model("notifications", "UnreadNotificationCounter")
+
+    unread = (
+        Notification.objects.filter(is_read=False)
+        .values("recipient_id")
+        .annotate(unread=Count("id"))
+        .values_list("recipient_id", "unread")
+    )
+    UnreadNotificationCounter.objects.bulk_create(
+        [
+            UnreadNotificationCounter(user_id=user_id, unread_count=count)
+            for user_id, count in unread
+        ],
+        update_conflicts=True,
+        unique_fields=["user"],
+        update_fields=["unread_count"],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0005_notification_retention"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_unread_counters, migrations.RunPython.noop),
+    ]
@@ -14,5 +14,53 @@ class Notification(models.Model):
     is_read = models.BooleanField(default=False)
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Unread counts and filters
+            models.Index(fields=["recipient", "is_read", "timestamp"]),
+            # The inbox, newest first, and incremental "since" fetches
+            models.Index(fields=["recipient", "-timestamp", "-id"]),
+        ]
+
     def __str__(self):
         return f"{self.sender} → {self.recipient}: {self.message}"
+
+
+class UnreadNotificationCounter(models.Model):
+    """
+    Per-user unread notification count, kept in step with Notification by
+    notifications/counters.py so the unread-count endpoint is a primary key read.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="notification_counter",
+    )
+    unread_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user}: {self.unread_count} unread"
+
+
+class ArchivedNotification(models.Model):
+    """Compact copy of a read notification removed by the archive_notifications job."""
+
+    original_id = models.BigIntegerField()
+    recipient = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="archived_notifications"
+    )
+    sender = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name="+"
+    )
+    message = models.TextField()
+    link = models.URLField(null=True, blank=True)
+    timestamp = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["recipient", "-timestamp"])]
+
+    def __str__(self):
+        return f"[archived] {self.sender} → {self.recipient}: {self.message}"
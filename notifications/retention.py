@@ -0,0 +1,106 @@
+import json
+import re
+
+from django.db import transaction
+from django.db.models import Count
+
+from .models import ArchivedNotification, Notification
+
+# Matches the message written by SharePageWithUsersView, collapsed entries ("... 3 times.")
+# and entries collapsed across pages by earlier releases ("... 3 pages with you.")
+SHARE_MESSAGE = re.compile(
+    r"^(?P<name>.+) has shared (?:a page|(?P<pages>\d+) pages) with you"
+    r"(?: (?P<times>\d+) times)?\.$"
+)
+SHARE_MESSAGE_SQL = r"^.+ has shared (a page|[0-9]+ pages) with you( [0-9]+ times)?\.$"
+
+
+def collapse_share_notifications(batch_size=500):
+    """
+    Merge repeated "X has shared a page with you." rows per recipient, sender, read
+    state and link into the newest row, rewritten as "X has shared a page with you N
+    times.". Shares of different pages stay separate so every page keeps its link.
+    Returns (rows removed, groups collapsed).
+    """
+    groups = list(
+        Notification.objects.filter(message__regex=SHARE_MESSAGE_SQL)
+        .values("recipient_id", "sender_id", "is_read", "link")
+        .annotate(rows=Count("id"))
+        .filter(rows__gt=1)
+        .order_by()
+    )
+    removed = 0
+    for start in range(0, len(groups), batch_size):
+        end = start + batch_size
+        with transaction.atomic():
+            for group in groups[start:end]:
+                removed += _collapse_group(group)
+    return removed, len(groups)
+
+
+def _collapse_group(group):
+    rows = list(
+        Notification.objects.filter(
+            recipient_id=group["recipient_id"],
+            sender_id=group["sender_id"],
+            is_read=group["is_read"],
+            link=group["link"],
+            message__regex=SHARE_MESSAGE_SQL,
+        )
+        .order_by("-timestamp", "-id")
+        .values_list("id", "message")
+    )
+    total = 0
+    name = None
+    for _, message in rows:
+        match = SHARE_MESSAGE.match(message)
+        name = name or match.group("name")
+        total += int(match.group("times") or match.group("pages") or 1)
+
+    newest_id = rows[0][0]
+    Notification.objects.filter(id=newest_id).update(
+        message=f"{name} has shared a page with you {total} times."
+    )
+    # delete() rather than a raw DELETE so the unread counters are decremented
+    Notification.objects.filter(id__in=[row_id for row_id, _ in rows[1:]]).delete()
+    return len(rows) - 1
+
+
+def archive_read_notifications(cutoff, batch_size=1000, output=None):
+    """
+    Move read notifications older than cutoff into ArchivedNotification, or append
+    them as JSON lines to the open file ``output``. Returns the number archived.
+    """
+    archived = 0
+    fields = ("id", "recipient_id", "sender_id", "message", "link", "timestamp")
+    while True:
+        ids = list(
+            Notification.objects.filter(is_read=True, timestamp__lt=cutoff)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return archived
+
+        rows = list(Notification.objects.filter(id__in=ids).values(*fields))
+        with transaction.atomic():
+            if output is not None:
+                for row in rows:
+                    output.write(json.dumps(row, default=str) + "\n")
+                output.flush()
+            else:
+                ArchivedNotification.objects.bulk_create(
+                    [
+                        ArchivedNotification(
+                            original_id=row["id"],
+                            recipient_id=row["recipient_id"],
+                            sender_id=row["sender_id"],
+                            message=row["message"],
+                            link=row["link"],
+                            timestamp=row["timestamp"],
+                        )
+                        for row in rows
+                    ]
+                )
+            Notification.objects.filter(id__in=ids).delete()
+        archived += len(rows)
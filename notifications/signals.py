@@ -0,0 +1,40 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .counters import decrement_unread, increment_unread
+from .models import Notification
+from .stream import broker, publish_notifications
+
+
+@receiver(pre_save, sender=Notification)
+def notification_changing(sender, instance, raw=False, **kwargs):
+    # Remember the stored read state so post_save can adjust the unread counter
+    if instance.pk and not raw:
+        instance._was_read = (
+            Notification.objects.filter(pk=instance.pk).values_list("is_read", flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Notification)
+def notification_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        if not instance.is_read:
+            increment_unread([instance.recipient_id])
+        if broker.has_subscribers(instance.recipient_id):
+            transaction.on_commit(lambda: publish_notifications([instance]))
+        return
+
+    was_read = getattr(instance, "_was_read", None)
+    if was_read is True and not instance.is_read:
+        increment_unread([instance.recipient_id])
+    elif was_read is False and instance.is_read:
+        decrement_unread(instance.recipient_id)
+
+
+@receiver(post_delete, sender=Notification)
+def notification_deleted(sender, instance, **kwargs):
+    if not instance.is_read:
+        decrement_unread(instance.recipient_id)
@@ -0,0 +1,95 @@
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    def __init__(self, user_id, loop, maxsize):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def offer(self, item):
+        # Runs on the subscriber's event loop
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            logger.warning("Dropping notification event for slow stream of user %s", self.user_id)
+
+
+class NotificationBroker:
+    """
+    In-process pub/sub between the Notification signals and the open SSE streams.
+
+    Publishers run in sync code (request threads, signal handlers); each event is
+    handed to the subscriber's event loop with call_soon_threadsafe. Only streams
+    connected to this process are reached, so run one ASGI process per sticky
+    client or accept that other processes' clients fall back to polling.
+    """
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+
+    def subscribe(self, user_id):
+        subscription = Subscription(user_id, asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscriptions[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def has_subscribers(self, user_id):
+        return bool(self._subscriptions.get(user_id))
+
+    def publish(self, user_id, event, data):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(user_id, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, (event, data))
+            except RuntimeError:
+                # The subscriber's loop has already shut down
+                self.unsubscribe(subscription)
+
+
+broker = NotificationBroker()
+
+
+def format_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def publish_notifications(notifications):
+    """Push new notifications and the recipients' unread counts to connected streams."""
+    # Imported here to keep this module free of model imports at load time
+    from .counters import get_unread_count
+    from .serializers import NotificationSerializer
+
+    notifications = [n for n in notifications if broker.has_subscribers(n.recipient_id)]
+    if not notifications:
+        return
+    for notification in notifications:
+        broker.publish(
+            notification.recipient_id,
+            "notification",
+            NotificationSerializer(notification).data,
+        )
+    for recipient_id in {n.recipient_id for n in notifications}:
+        publish_unread_count(recipient_id, get_unread_count(recipient_id))
+
+
+def publish_unread_count(user_id, count):
+    if broker.has_subscribers(user_id):
+        broker.publish(user_id, "unread_count", {"unread_count": count})
@@ -1,3 +1,319 @@
-from django.test import TestCase
+import asyncio
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from notifications.counters import get_unread_count
+from notifications.models import (
+    ArchivedNotification,
+    Notification,
+    UnreadNotificationCounter,
+)
+from notifications.stream import broker, publish_notifications
+from users.tests import BaseAPITestCase
+
+
+def parse_event(chunk):
+    if isinstance(chunk, bytes):
+        chunk = chunk.decode()
+    fields = dict(line.split(": ", 1) for line in chunk.strip().splitlines())
+    return fields["event"], json.loads(fields["data"])
+
+
+class NotificationStreamTests(BaseAPITestCase):
+    async def test_broker_delivers_to_subscribers_of_the_user_only(self):
+        subscription = broker.subscribe(self.user1.id)
+        try:
+            broker.publish(self.user2.id, "notification", {"id": 1})
+            broker.publish(self.user1.id, "notification", {"id": 2})
+            event = await asyncio.wait_for(subscription.queue.get(), timeout=1)
+            self.assertEqual(event, ("notification", {"id": 2}))
+            self.assertTrue(subscription.queue.empty())
+        finally:
+            broker.unsubscribe(subscription)
+        self.assertFalse(broker.has_subscribers(self.user1.id))
+
+    async def test_created_notification_is_published_after_commit(self):
+        def create():
+            with self.captureOnCommitCallbacks(execute=True):
+                Notification.objects.create(
+                    recipient=self.user1, sender=self.user2, message="Hello"
+                )
+
+        subscription = broker.subscribe(self.user1.id)
+        try:
+            await sync_to_async(create)()
+            event, data = await asyncio.wait_for(subscription.queue.get(), timeout=1)
+            self.assertEqual((event, data["message"]), ("notification", "Hello"))
+            event, data = await asyncio.wait_for(subscription.queue.get(), timeout=1)
+            self.assertEqual((event, data), ("unread_count", {"unread_count": 1}))
+        finally:
+            broker.unsubscribe(subscription)
+
+    async def test_stream_requires_authentication(self):
+        response = await self.async_client.get(reverse("notification-stream"))
+        self.assertEqual(response.status_code, 401)
+
+    async def test_stream_subscribes_only_once_the_body_is_read(self):
+        token = str(AccessToken.for_user(self.user1))
+        response = await self.async_client.get(reverse("notification-stream"), {"token": token})
+        # A client that disconnects now never starts the body, so nothing may be left behind
+        self.assertFalse(broker.has_subscribers(self.user1.id))
+
+        stream = response.streaming_content
+        await anext(stream)
+        self.assertTrue(broker.has_subscribers(self.user1.id))
+        await stream.aclose()
+
+    async def test_stream_sends_unread_count_then_new_notifications(self):
+        await Notification.objects.acreate(recipient=self.user1, sender=self.user2, message="Hi")
+        token = str(AccessToken.for_user(self.user1))
+
+        response = await self.async_client.get(reverse("notification-stream"), {"token": token})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+
+        stream = response.streaming_content
+        try:
+            self.assertEqual(
+                parse_event(await anext(stream)), ("unread_count", {"unread_count": 1})
+            )
+            notification = await Notification.objects.acreate(
+                recipient=self.user1, sender=self.user2, message="New"
+            )
+            await sync_to_async(publish_notifications)([notification])
+            event, data = parse_event(await asyncio.wait_for(anext(stream), timeout=1))
+            self.assertEqual((event, data["message"]), ("notification", "New"))
+        finally:
+            await stream.aclose()
+
+
+class UserNotificationsInboxTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.user1)
+        self.notifications = [
+            Notification.objects.create(
+                recipient=self.user1, sender=self.user2, message=f"Message {index}"
+            )
+            for index in range(5)
+        ]
+        Notification.objects.create(recipient=self.user2, sender=self.user1, message="Other")
+
+    def test_plain_list_newest_first(self):
+        response = self.client.get(reverse("user-notifications"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [n["message"] for n in response.data], [f"Message {i}" for i in range(4, -1, -1)]
+        )
+
+    def test_cursor_pagination(self):
+        url = reverse("user-notifications") + "?page_size=2"
+        messages = []
+        while url:
+            with self.assertNumQueries(1):
+                response = self.client.get(url)
+            messages += [n["message"] for n in response.data["results"]]
+            url = response.data["next"]
+        self.assertEqual(messages, [f"Message {i}" for i in range(4, -1, -1)])
+
+    def test_since_id(self):
+        since = self.notifications[2].id
+        response = self.client.get(reverse("user-notifications"), {"since": since})
+        self.assertEqual([n["message"] for n in response.data], ["Message 4", "Message 3"])
+
+    def test_since_timestamp(self):
+        Notification.objects.filter(id=self.notifications[0].id).update(
+            timestamp=self.notifications[0].timestamp - timedelta(days=1)
+        )
+        since = (self.notifications[0].timestamp - timedelta(hours=1)).isoformat()
+        response = self.client.get(reverse("user-notifications"), {"since": since})
+        self.assertEqual(len(response.data), 4)
+
+    def test_invalid_since(self):
+        response = self.client.get(reverse("user-notifications"), {"since": "yesterday"})
+        self.assertEqual(response.status_code, 400)
+
+
+class UnreadNotificationCounterTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.user1)
+
+    def notify(self, recipient=None):
+        return Notification.objects.create(
+            recipient=recipient or self.user1, sender=self.user2, message="Hello"
+        )
+
+    def unread(self, user=None):
+        return get_unread_count((user or self.user1).id)
+
+    def test_count_endpoint_is_a_single_read(self):
+        self.notify()
+        self.notify()
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/notifications/unread_count/")
+        self.assertEqual(response.data, {"unread_count": 2})
+
+    def test_counter_follows_read_state_changes(self):
+        notification = self.notify()
+        self.notify()
+        self.assertEqual(self.unread(), 2)
+
+        notification.is_read = True
+        notification.save()
+        self.assertEqual(self.unread(), 1)
+        notification.is_read = False
+        notification.save()
+        self.assertEqual(self.unread(), 2)
+
+        notification.delete()
+        self.assertEqual(self.unread(), 1)
+
+    def test_mark_as_read(self):
+        self.notify()
+        self.notify(recipient=self.user2)
+        response = self.client.post("/api/notifications/mark_as_read/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.unread(), 0)
+        self.assertEqual(self.unread(self.user2), 1)
+
+    def test_share_fan_out_increments_recipients(self):
+        data = {"page_id": self.collection1.id, "usernames": ["user2"], "permission": "view"}
+        self.client.post(reverse("share-page"), data, format="json")
+        self.assertEqual(self.unread(self.user2), 1)
+
+    def test_reconcile_command_repairs_drift(self):
+        self.notify()
+        self.notify()
+        UnreadNotificationCounter.objects.filter(user=self.user1).update(unread_count=7)
+        UnreadNotificationCounter.objects.create(user=self.user2, unread_count=3)
+
+        out = StringIO()
+        call_command("reconcile_notification_counters", stdout=out)
+        self.assertIn("Repaired 2", out.getvalue())
+        self.assertEqual(self.unread(), 2)
+        self.assertEqual(self.unread(self.user2), 0)
+
+
+class UnreadCounterBackfillMigrationTests(TransactionTestCase):
+    before = [("notifications", "0005_notification_retention")]
+    after = [("notifications", "0006_backfill_unread_counters")]
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_backfill_counts_unread_notifications(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.before)
+        apps = executor.loader.project_state(self.before).apps
+        User = apps.get_model("users", "User")
+        sender = User.objects.create(username="sender")
+        reader = User.objects.create(username="reader")
+        Notification = apps.get_model("notifications", "Notification")
+        for is_read in (False, False, True):
+            Notification.objects.create(
+                recipient=reader, sender=sender, message="Shared", is_read=is_read
+            )
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.after)
+
+        self.assertEqual(get_unread_count(reader.id), 2)
+        self.assertEqual(get_unread_count(sender.id), 0)
+
+
+class NotificationRetentionTests(BaseAPITestCase):
+    def notify(self, message, is_read=False, days_old=0, sender=None, link=None):
+        notification = Notification.objects.create(
+            recipient=self.user1,
+            sender=sender or self.user2,
+            message=message,
+            is_read=is_read,
+            link=link,
+        )
+        if days_old:
+            Notification.objects.filter(id=notification.id).update(
+                timestamp=timezone.now() - timedelta(days=days_old)
+            )
+        return notification
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command("archive_notifications", *args, stdout=out)
+        return out.getvalue()
+
+    def test_collapses_repeated_share_notifications(self):
+        for _ in range(3):
+            self.notify("user2 has shared a page with you.")
+        newest = self.notify("user2 has shared a page with you.")
+        self.notify("Something else")
+        self.notify("user1 has shared a page with you.", sender=self.user1)
+
+        output = self.run_command()
+
+        self.assertIn("Collapsed 3 share notifications into 1 aggregated entries", output)
+        newest.refresh_from_db()
+        self.assertEqual(newest.message, "user2 has shared a page with you 4 times.")
+        self.assertEqual(Notification.objects.count(), 3)
+        self.assertEqual(get_unread_count(self.user1.id), 3)
+
+        # A later share folds into the aggregated entry
+        self.notify("user2 has shared a page with you.")
+        self.run_command()
+        newest = Notification.objects.get(message__startswith="user2")
+        self.assertEqual(newest.message, "user2 has shared a page with you 5 times.")
+
+    def test_collapse_keeps_a_link_to_every_shared_page(self):
+        for link in ("/collections/1", "/collections/1", "/collections/2"):
+            self.notify("user2 has shared a page with you.", link=link)
+
+        output = self.run_command()
+
+        self.assertIn("Collapsed 1 share notifications into 1 aggregated entries", output)
+        self.assertEqual(
+            set(Notification.objects.values_list("link", "message")),
+            {
+                ("/collections/1", "user2 has shared a page with you 2 times."),
+                ("/collections/2", "user2 has shared a page with you."),
+            },
+        )
+
+    def test_archives_old_read_notifications_to_table(self):
+        old = self.notify("Old and read", is_read=True, days_old=120)
+        self.notify("Old but unread", days_old=120)
+        self.notify("Recent and read", is_read=True, days_old=5)
+
+        output = self.run_command("--older-than-days", "90", "--batch-size", "1")
+
+        self.assertIn("Archived 1 read notifications", output)
+        self.assertFalse(Notification.objects.filter(id=old.id).exists())
+        archived = ArchivedNotification.objects.get()
+        self.assertEqual((archived.original_id, archived.message), (old.id, "Old and read"))
+        self.assertEqual(Notification.objects.count(), 2)
+
+    def test_archives_to_json_lines_file(self):
+        for index in range(3):
+            self.notify(f"Old {index}", is_read=True, days_old=100)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "archive.jsonl")
+            self.run_command("--output", path, "--batch-size", "2")
+            with open(path, encoding="utf-8") as archive:
+                rows = [json.loads(line) for line in archive]
+
+        self.assertEqual([row["message"] for row in rows], ["Old 0", "Old 1", "Old 2"])
+        self.assertEqual(Notification.objects.count(), 0)
+        self.assertEqual(ArchivedNotification.objects.count(), 0)
@@ -1,9 +1,15 @@
 # notifications/urls.py
 from django.urls import path
-from .views import MarkNotificationsAsReadView, UnreadNotificationCountView, UserNotificationsView
+from .views import (
+    MarkNotificationsAsReadView,
+    UnreadNotificationCountView,
+    UserNotificationsView,
+    notification_stream,
+)
 
 urlpatterns = [
     path("my/", UserNotificationsView.as_view(), name="user-notifications"),
     path("unread_count/", UnreadNotificationCountView.as_view()),
     path("mark_as_read/", MarkNotificationsAsReadView.as_view()),
+    path("stream/", notification_stream, name="notification-stream"),
 ]
@@ -1,31 +1,128 @@
 # notifications/views.py
+import asyncio
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.db.models import Q
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from .counters import decrement_unread, get_unread_count
 from .models import Notification
 from .serializers import NotificationSerializer
+from .stream import broker, format_event, publish_unread_count
+from users.authentication import aget_request_user
+from life_tracker_backend.pagination import KeysetPagination
+
+
+class NotificationPagination(KeysetPagination):
+    ordering = ("-timestamp", "-id")
 
 
 class UserNotificationsView(APIView):
+    """
+    The user's notifications, newest first.
+
+    ``?since=<id>`` or ``?since=<ISO timestamp>`` returns only newer notifications, so
+    clients can fetch incrementally. ``?page_size=`` / ``?cursor=`` switch to keyset
+    pagination with a ``{"next", "results"}`` envelope.
+    """
+
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        notifications = Notification.objects.filter(recipient=request.user).order_by("-timestamp")
+        notifications = (
+            Notification.objects.filter(recipient=request.user)
+            .select_related("sender")
+            .order_by("-timestamp", "-id")
+        )
+        since = request.query_params.get("since")
+        if since:
+            notifications = notifications.filter(self.since_filter(since))
+
+        paginator = NotificationPagination()
+        page = paginator.paginate_queryset(notifications, request, view=self)
+        if page is not None:
+            return paginator.get_paginated_response(NotificationSerializer(page, many=True).data)
+
         serializer = NotificationSerializer(notifications, many=True)
         return Response(serializer.data)
 
+    def since_filter(self, since):
+        if since.isdigit():
+            return Q(id__gt=int(since))
+        # A "+" in an unencoded query string arrives as a space
+        try:
+            timestamp = parse_datetime(since.replace(" ", "+"))
+        except ValueError:
+            timestamp = None
+        if timestamp is None:
+            raise ValidationError({"since": "Use a notification id or an ISO 8601 timestamp."})
+        return Q(timestamp__gt=timestamp)
+
 
 class UnreadNotificationCountView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        count = Notification.objects.filter(recipient=request.user, is_read=False).count()
-        return Response({"unread_count": count})
+        return Response({"unread_count": get_unread_count(request.user.id)})
 
 
 class MarkNotificationsAsReadView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        Notification.objects.filter(recipient=request.user, is_read=False).update(is_read=True)
+        with transaction.atomic():
+            marked = Notification.objects.filter(recipient=request.user, is_read=False).update(
+                is_read=True
+            )
+            # Only subtract what was marked, so notifications arriving meanwhile still count
+            decrement_unread(request.user.id, marked)
+        publish_unread_count(request.user.id, get_unread_count(request.user.id))
         return Response({"status": "success"})
+
+
+async def notification_stream(request):
+    """
+    Server-Sent Events stream of new notifications and unread-count changes.
+
+    Events: ``unread_count`` (sent once on connect and after every change) and
+    ``notification``. A comment line is sent every NOTIFICATION_STREAM_KEEPALIVE
+    seconds so proxies keep the connection open. Requires an ASGI server.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {"error": "The notification stream requires an ASGI server."}, status=501
+        )
+
+    user = await aget_request_user(request)
+    if not user.is_authenticated:
+        return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+
+    async def events():
+        # Subscribed only once the body is being sent: the generator's finally does not
+        # run for a client that disconnects before that, so the subscription would leak
+        subscription = broker.subscribe(user.id)
+        try:
+            unread_count = await sync_to_async(get_unread_count)(user.id)
+            yield format_event("unread_count", {"unread_count": unread_count})
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(
+                        subscription.queue.get(), timeout=settings.NOTIFICATION_STREAM_KEEPALIVE
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_event(event, data)
+        finally:
+            broker.unsubscribe(subscription)
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from life_tracker_backend.metrics import record_cache_lookup
+
+
+def user_collections_key(user_id):
+    return f"pages:collections:{user_id}"
+
+
+def shared_collections_key(user_id):
+    return f"pages:shared:{user_id}"
+
+
+def token_key(token):
+    return f"pages:token:{token}"
+
+
+def get_or_build(key, build):
+    """Return the cached payload for key, building and storing it on a miss."""
+    if not settings.RESPONSE_CACHE_TIMEOUT:
+        return build()
+    data = cache.get(key)
+    record_cache_lookup("response", data is not None)
+    if data is None:
+        data = build()
+        cache.set(key, data, settings.RESPONSE_CACHE_TIMEOUT)
+    return data
+
+
+def invalidate_users(user_ids):
+    keys = []
+    for user_id in set(user_ids):
+        keys += [user_collections_key(user_id), shared_collections_key(user_id)]
+    if keys:
+        cache.delete_many(keys)
+
+
+def invalidate_token(token):
+    cache.delete(token_key(token))
@@ -0,0 +1,38 @@
+# Generated by Django 5.2 on 2026-10-18 20:40
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="Collection",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("title", models.CharField(max_length=255)),
+                ("description", models.TextField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("is_link_shareable", models.BooleanField(default=False)),
+                ("shareable_link_token", models.UUIDField(default=uuid.uuid4, unique=True)),
+                (
+                    "shareable_permission",
+                    models.CharField(
+                        choices=[("view", "View"), ("edit", "Edit")], default="view", max_length=10
+                    ),
+                ),
+                ("active", models.BooleanField(default=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,33 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from sharing.models import CollectionAccess, SharedPage
+from .cache import invalidate_token, invalidate_users
+from .models import Collection
+
+
+def invalidate_collection(collection):
+    user_ids = list(
+        CollectionAccess.objects.filter(collection=collection).values_list("user_id", flat=True)
+    )
+    invalidate_users(user_ids + [collection.owner_id])
+    invalidate_token(collection.shareable_link_token)
+
+
+@receiver(post_save, sender=Collection)
+def collection_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_collection(instance)
+
+
+@receiver(pre_delete, sender=Collection)
+def collection_deleted(sender, instance, **kwargs):
+    # pre_delete: the access rows are removed by the cascade before post_delete runs
+    invalidate_collection(instance)
+
+
+@receiver(post_save, sender=SharedPage)
+@receiver(post_delete, sender=SharedPage)
+def shared_page_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_users([instance.shared_with_id])
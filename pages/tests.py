@@ -1,12 +1,16 @@
 import uuid
 from datetime import datetime, timedelta
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase, APIClient
 from django.contrib.auth import get_user_model
-from users.models import EmailVerificationToken, PasswordResetToken
+from users.models import EmailVerificationToken, PasswordResetToken, User
 from pages.models import Collection
-from sharing.models import SharedPage
+from notifications.models import Notification
+from sharing.models import CollectionAccess, SharedPage
 from tasks.models import Task
 from tracker.models import Note
 from users.tests import BaseAPITestCase
@@ -82,3 +86,173 @@ class CollectionAPITests(BaseAPITestCase):
         self.assertTrue(
             SharedPage.objects.filter(page=self.collection1, shared_with=self.user2).exists()
         )
+
+
+class CollectionDetailWithTasksTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.user2)
+        self.url = reverse("collection-tasks", args=[self.collection1.id])
+
+    def test_collection_and_tasks_in_two_queries(self):
+        for index in range(5):
+            Task.objects.create(
+                title=f"Extra {index}",
+                due_date=datetime.now().date(),
+                start_time="09:00:00",
+                end_time="10:00:00",
+                category="Work",
+                collection=self.collection1,
+                owner=self.user2,
+            )
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["tasks"]), 6)
+        self.assertEqual(response.data["collection"]["owner"], "user1")
+
+    def test_link_shareable_collection_without_share_entry(self):
+        SharedPage.objects.filter(page=self.collection1, shared_with=self.user2).delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_no_access(self):
+        self.client.force_authenticate(user=self.user1)
+        response = self.client.get(reverse("collection-tasks", args=[self.collection2.id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_etag_not_modified(self):
+        response = self.client.get(self.url)
+        etag = response["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_etag_changes_when_tasks_change(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        self.task1.completed = True
+        self.task1.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+        etag = response["ETag"]
+        self.task1.delete()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["tasks"], [])
+
+    def test_etag_changes_when_task_owner_is_renamed(self):
+        self.task1.owner = self.user2
+        self.task1.save()
+        etag = self.client.get(self.url)["ETag"]
+
+        self.user2.username = "renamed"
+        self.user2.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["tasks"][0]["owner"], "renamed")
+
+
+@override_settings(RESPONSE_CACHE_TIMEOUT=300)
+class CollectionResponseCacheTests(BaseAPITestCase):
+    def test_token_page_served_from_cache(self):
+        url = reverse("page-by-token", args=[self.collection1.shareable_link_token])
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.data["title"], "User1 Collection")
+
+    @override_settings(RESPONSE_CACHE_TIMEOUT=0)
+    def test_zero_timeout_turns_caching_off(self):
+        url = reverse("page-by-token", args=[self.collection1.shareable_link_token])
+        self.client.get(url)
+        Collection.objects.filter(id=self.collection1.id).update(title="Renamed")
+        self.assertEqual(self.client.get(url).data["title"], "Renamed")
+
+    def test_token_page_invalidated_on_collection_change(self):
+        url = reverse("page-by-token", args=[self.collection1.shareable_link_token])
+        self.client.get(url)
+
+        self.collection1.title = "Renamed"
+        self.collection1.save()
+        self.assertEqual(self.client.get(url).data["title"], "Renamed")
+
+        self.collection1.is_link_shareable = False
+        self.collection1.save()
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_collection_list_invalidated_on_create(self):
+        self.client.force_authenticate(user=self.user1)
+        self.assertEqual(len(self.client.get(reverse("pages-list")).data), 1)
+
+        self.client.post(reverse("pages-list"), {"title": "Second"}, format="json")
+        self.assertEqual(len(self.client.get(reverse("pages-list")).data), 2)
+
+    def test_shared_collections_invalidated_on_share_changes(self):
+        self.client.force_authenticate(user=self.user2)
+        url = reverse("shared-collections")
+        self.assertEqual(len(self.client.get(url).data), 1)
+
+        SharedPage.objects.filter(page=self.collection1, shared_with=self.user2).delete()
+        self.assertEqual(len(self.client.get(url).data), 0)
+
+        SharedPage.objects.create(page=self.collection1, shared_with=self.user2, permission="view")
+        self.assertEqual(len(self.client.get(url).data), 1)
+
+        self.collection1.title = "Renamed"
+        self.collection1.save()
+        self.assertEqual(self.client.get(url).data[0]["title"], "Renamed")
+
+
+class SharePageFanOutTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.user1)
+        self.recipients = [
+            User.objects.create(username=f"teammate{index}", email=f"t{index}@example.com")
+            for index in range(12)
+        ]
+
+    def share(self, usernames, permission="view"):
+        data = {"page_id": self.collection1.id, "usernames": usernames, "permission": permission}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse("share-page"), data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries)
+
+    def test_query_count_is_constant(self):
+        few = self.share([user.username for user in self.recipients[:2]])
+        many = self.share([user.username for user in self.recipients[2:]])
+        self.assertEqual(few, many)
+        self.assertEqual(
+            SharedPage.objects.filter(page=self.collection1).count(), len(self.recipients) + 1
+        )
+        self.assertEqual(Notification.objects.count(), len(self.recipients))
+
+    def test_resharing_updates_permission_and_access_index(self):
+        self.share(["user2"], permission="view")
+        self.assertEqual(
+            SharedPage.objects.get(page=self.collection1, shared_with=self.user2).permission, "view"
+        )
+        self.assertEqual(
+            CollectionAccess.objects.get(collection=self.collection1, user=self.user2).permission,
+            "view",
+        )
+        self.assertFalse(
+            CollectionAccess.objects.filter(
+                collection=self.collection1, user=self.recipients[0]
+            ).exists()
+        )
+
+    def test_owner_is_never_shared_with(self):
+        self.share(["user1"])
+        self.assertFalse(SharedPage.objects.filter(shared_with=self.user1).exists())
+
+    def test_invalid_permission(self):
+        data = {"page_id": self.collection1.id, "usernames": ["user2"], "permission": "admin"}
+        response = self.client.post(reverse("share-page"), data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
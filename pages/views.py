@@ -1,17 +1,30 @@
 # views.py
+import hashlib
 from rest_framework import viewsets, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.generics import RetrieveAPIView
-from django.db.models import Q
+from django.db.models import Aggregate, Count, Exists, Max, OuterRef, Q, TextField
+from django.db import transaction
+from django.utils.http import parse_etags
+from pages.cache import (
+    get_or_build,
+    invalidate_users,
+    shared_collections_key,
+    token_key,
+    user_collections_key,
+)
 from pages.models import Collection
-from sharing.models import SharedPage
+from sharing.access import grant_shared_access
+from sharing.models import CollectionAccess, SharedPage
 from pages.serializers import CollectionShareSerializer, LinkShareSettingsSerializer
 from tasks.models import Task
 from tasks.serializers import TaskSerializer
 from users.models import User
 from rest_framework.exceptions import PermissionDenied
 from notifications.models import Notification
+from notifications.counters import increment_unread
+from notifications.stream import publish_notifications
 from django.conf import settings
 
 
@@ -22,7 +35,14 @@ class PageViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         # Retrieve only collections owned by the user
         user = self.request.user
-        return Collection.objects.filter(owner=user, active=True).distinct()
+        return Collection.objects.filter(owner=user, active=True).select_related("owner")
+
+    def list(self, request, *args, **kwargs):
+        data = get_or_build(
+            user_collections_key(request.user.id),
+            lambda: list(super(PageViewSet, self).list(request, *args, **kwargs).data),
+        )
+        return Response(data)
 
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user)
@@ -46,12 +66,16 @@ class SharedWithUserCollectionsView(APIView):
     def get(self, request):
         # Retrieve collections shared with the user
         user = self.request.user
-        shared_collections = Collection.objects.filter(
-            shared_entries__shared_with=user, active=True
-        ).distinct()
 
-        serializer = CollectionShareSerializer(shared_collections, many=True)
-        return Response(serializer.data, status=200)
+        def build():
+            shared_collections = Collection.objects.filter(
+                access_entries__user=user,
+                access_entries__permission__in=["view", "edit"],
+                active=True,
+            ).select_related("owner")
+            return list(CollectionShareSerializer(shared_collections, many=True).data)
+
+        return Response(get_or_build(shared_collections_key(user.id), build), status=200)
 
 
 class SharePageWithUsersView(APIView):
@@ -67,28 +91,49 @@ class SharePageWithUsersView(APIView):
         except Collection.DoesNotExist:
             return Response({"error": "Page not found or you are not the owner."}, status=404)
 
-        shared_users = User.objects.filter(username__in=usernames).exclude(id=page.owner.id)
-        created = []
+        if permission not in ("view", "edit"):
+            return Response({"error": "Permission must be 'view' or 'edit'."}, status=400)
+
+        shared_users = list(
+            User.objects.filter(username__in=usernames)
+            .exclude(id=page.owner_id)
+            .only("id", "username")
+        )
+        created = [user.username for user in shared_users]
 
         # if page.is_link_shareable:
         #     page_url = f"{settings.FRONTEND_BASE_URL}/shared-page/{page.shareable_link_token}/"
         # else:
         page_url = f"{settings.FRONTEND_BASE_URL}/collections/{page.id}/"
 
-        for user in shared_users:
-            shared_entry, created_flag = SharedPage.objects.update_or_create(
-                page=page,
-                shared_with=user,
-                defaults={"permission": permission},
+        # A fixed number of statements regardless of how many users are shared with
+        entries = [
+            SharedPage(page=page, shared_with=user, permission=permission) for user in shared_users
+        ]
+        with transaction.atomic():
+            SharedPage.objects.bulk_create(
+                entries,
+                update_conflicts=True,
+                unique_fields=["page", "shared_with"],
+                update_fields=["permission"],
             )
-            created.append(user.username)
-
-            Notification.objects.create(
-                recipient=user,
-                sender=request.user,
-                message=f"{request.user.username} has shared a page with you.",
-                link=page_url,
+            # bulk_create skips the post_save signals that maintain the access index
+            grant_shared_access(entries)
+            notifications = Notification.objects.bulk_create(
+                [
+                    Notification(
+                        recipient=user,
+                        sender=request.user,
+                        message=f"{request.user.username} has shared a page with you.",
+                        link=page_url,
+                    )
+                    for user in shared_users
+                ]
             )
+            # bulk_create skips post_save: update unread counters and open streams here
+            increment_unread([user.id for user in shared_users])
+            transaction.on_commit(lambda: publish_notifications(notifications))
+        invalidate_users([user.id for user in shared_users])
 
         return Response(
             {
@@ -103,7 +148,7 @@ class SharePageWithUsersView(APIView):
 class PageByTokenView(RetrieveAPIView):
     serializer_class = CollectionShareSerializer
     lookup_field = "shareable_link_token"
-    queryset = Collection.objects.filter(active=True)
+    queryset = Collection.objects.filter(active=True).select_related("owner")
 
     def get_object(self):
         obj = super().get_object()
@@ -111,39 +156,95 @@ class PageByTokenView(RetrieveAPIView):
             raise PermissionDenied("This page is not available")
         return obj
 
+    def retrieve(self, request, *args, **kwargs):
+        # Public share links are the hottest unauthenticated path; only successful
+        # lookups are cached, so unavailable pages keep returning 403/404.
+        data = get_or_build(
+            token_key(kwargs[self.lookup_field]),
+            lambda: dict(super(PageByTokenView, self).retrieve(request, *args, **kwargs).data),
+        )
+        return Response(data)
+
 
 class CollectionDetailWithTasks(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request, collection_id):
-        try:
-            # First try to find the collection with direct access rights
-            try:
-                collection = (
-                    Collection.objects.filter(
-                        Q(id=collection_id),
-                        Q(owner=request.user) | Q(shared_entries__shared_with=request.user),
-                        active=True,
-                    )
-                    .distinct()
-                    .get()
-                )
-            except Collection.DoesNotExist:
-                # If not found, check if it's a link-shareable collection
-                collection = Collection.objects.get(
-                    id=collection_id,
-                    is_link_shareable=True, 
-                    shareable_permission__in=["view", "edit"],
-                    active=True
-                )
-        except Collection.DoesNotExist:
+        # One query resolves access (direct access through the access index, or a
+        # link-shareable collection) and the freshness data used for the ETag
+        collection = (
+            Collection.objects.filter(id=collection_id, active=True)
+            .annotate(
+                has_access=Exists(
+                    CollectionAccess.objects.filter(collection=OuterRef("pk"), user=request.user)
+                ),
+                tasks_updated_at=Max("tasks__updated_at"),
+                task_count=Count("tasks"),
+                task_owners=GroupConcat("tasks__owner__username", distinct=True),
+            )
+            .filter(
+                Q(has_access=True)
+                | Q(is_link_shareable=True, shareable_permission__in=["view", "edit"])
+            )
+            .select_related("owner")
+            .first()
+        )
+        if collection is None:
             return Response({"error": "Collection not found or no access."}, status=404)
 
+        etag = collection_etag(collection)
+        # Weak comparison, as required for If-None-Match
+        if_none_match = {
+            tag.removeprefix("W/") for tag in parse_etags(request.headers.get("If-None-Match", ""))
+        }
+        if "*" in if_none_match or etag.removeprefix("W/") in if_none_match:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
         collection_data = CollectionShareSerializer(collection).data
-        tasks = Task.objects.filter(collection=collection)
+        tasks = Task.objects.filter(collection=collection).select_related("owner")
         tasks_data = TaskSerializer(tasks, many=True).data
 
-        return Response({"collection": collection_data, "tasks": tasks_data}, status=200)
+        return Response(
+            {"collection": collection_data, "tasks": tasks_data}, status=200, headers={"ETag": etag}
+        )
+
+
+class GroupConcat(Aggregate):
+    """Comma-joined values: GROUP_CONCAT on SQLite, STRING_AGG on PostgreSQL."""
+
+    function = "GROUP_CONCAT"
+    allow_distinct = True
+    output_field = TextField()
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler,
+            connection,
+            function="STRING_AGG",
+            template="%(function)s(%(distinct)s%(expressions)s, ',')",
+            **extra_context,
+        )
+
+
+def collection_etag(collection):
+    """
+    Weak ETag for a collection and its tasks. Task deletions do not move the max
+    updated_at, so the task count is part of the fingerprint as well. Usernames are
+    serialized with the collection and its tasks but renaming a user touches neither,
+    so the owners' usernames are included too.
+    """
+    fingerprint = ":".join(
+        str(value)
+        for value in (
+            collection.id,
+            collection.updated_at.isoformat(),
+            collection.owner.username,
+            collection.tasks_updated_at.isoformat() if collection.tasks_updated_at else "",
+            collection.task_count,
+            collection.task_owners or "",
+        )
+    )
+    return f'W/"{hashlib.md5(fingerprint.encode()).hexdigest()}"'
 
 
 class UpdateLinkShareSettingsView(APIView):
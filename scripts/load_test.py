@@ -0,0 +1,157 @@
+"""
+HTTP load test for the API, standard library only.
+
+Hit a running server:
+
+    python scripts/load_test.py --base-url http://127.0.0.1:8000 --path /api/tasks/ \
+        --token <access token> --requests 2000 --concurrency 32
+
+Or compare the old dev-server setup against the production gunicorn setups (ASGI
+uvicorn workers and WSGI threads). Each is started locally on a free port with
+the current environment (SECRET_KEY etc. must be set) and measured on the same
+paths:
+
+    python scripts/load_test.py --compare
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_PATHS = ["/admin/login/", "/static/admin/css/base.css"]
+
+
+def request_once(url, headers, timeout):
+    started = time.perf_counter()
+    try:
+        request = urllib.request.Request(url, headers=headers)
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except (urllib.error.URLError, OSError):
+        status = None
+    return status, time.perf_counter() - started
+
+
+def run_load(url, total, concurrency, headers, timeout=30):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda _: request_once(url, headers, timeout), range(total)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for _, latency in results)
+    ok = sum(1 for status, _ in results if status is not None and status < 400)
+    return {
+        "url": url,
+        "requests": total,
+        "concurrency": concurrency,
+        "ok": ok,
+        "errors": total - ok,
+        "requests_per_second": round(total / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2),
+    }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_listening(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server did not start listening on port {port}")
+
+
+SERVERS = {
+    # name: (command, extra environment)
+    "runserver": (["manage.py", "runserver", "--noreload", "127.0.0.1:{port}"], {}),
+    "gunicorn-uvicorn": (
+        ["-m", "gunicorn", "-c", "gunicorn.conf.py", "--bind", "127.0.0.1:{port}"],
+        {"GUNICORN_SERVER": "uvicorn", "GUNICORN_ACCESS_LOG": "/dev/null"},
+    ),
+    "gunicorn-gthread": (
+        ["-m", "gunicorn", "-c", "gunicorn.conf.py", "--bind", "127.0.0.1:{port}"],
+        {"GUNICORN_SERVER": "gthread", "GUNICORN_ACCESS_LOG": "/dev/null"},
+    ),
+}
+
+
+def compare(args, headers):
+    if not (BASE_DIR / "staticfiles" / "staticfiles.json").exists():
+        subprocess.run(
+            [sys.executable, "manage.py", "collectstatic", "--noinput"], cwd=BASE_DIR, check=True
+        )
+
+    report = []
+    for name, (command, extra_env) in SERVERS.items():
+        port = free_port()
+        process = subprocess.Popen(
+            [sys.executable] + [part.format(port=port) for part in command],
+            cwd=BASE_DIR,
+            env={**os.environ, **extra_env},
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_until_listening(port, process)
+            for path in args.path or DEFAULT_PATHS:
+                url = f"http://127.0.0.1:{port}{path}"
+                # Warm up every worker before measuring
+                run_load(url, args.concurrency * 4, args.concurrency, headers)
+                result = run_load(url, args.requests, args.concurrency, headers)
+                report.append({"server": name, **result})
+                print(json.dumps(report[-1]), file=sys.stderr)
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--path", action="append", help="Path to request; repeatable")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--token", help="JWT access token sent as a Bearer header")
+    parser.add_argument(
+        "--compare", action="store_true", help="Start runserver and gunicorn locally and compare"
+    )
+    args = parser.parse_args()
+
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    if args.compare:
+        report = compare(args, headers)
+    else:
+        report = [
+            run_load(args.base_url.rstrip("/") + path, args.requests, args.concurrency, headers)
+            for path in args.path or DEFAULT_PATHS
+        ]
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+#!/bin/sh
+# Container entrypoint: the outbox worker in the background, gunicorn in front.
+# Set EMAIL_OUTBOX_WORKER=0 when send_queued_emails runs as a separate service.
+set -e
+
+outbox=$(echo "${EMAIL_OUTBOX_ENABLED:-true}" | tr '[:upper:]' '[:lower:]')
+case "$outbox" in
+    false|f|no|n|off|0) ;;
+    *)
+        if [ "${EMAIL_OUTBOX_WORKER:-1}" = "1" ]; then
+            # Restarted if it exits, so a crash does not leave the queue undelivered
+            (
+                while true; do
+                    python manage.py send_queued_emails || true
+                    sleep 5
+                done
+            ) &
+        fi
+        ;;
+esac
+
+exec gunicorn -c gunicorn.conf.py
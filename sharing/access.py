@@ -0,0 +1,75 @@
+from .models import EDIT_ACCESS, CollectionAccess, SharedPage
+
+
+def accessible_collection_ids(user):
+    """Subquery of the ids of every collection the user owns or has been shared."""
+    return CollectionAccess.objects.filter(user=user).values("collection_id")
+
+
+def get_permission(user, collection):
+    """Return "owner", "edit", "view" or None for the user's access to a collection."""
+    return (
+        CollectionAccess.objects.filter(user=user, collection=collection)
+        .values_list("permission", flat=True)
+        .first()
+    )
+
+
+def can_edit(user, collection):
+    return get_permission(user, collection) in EDIT_ACCESS
+
+
+def grant_shared_access(shared_pages):
+    """Insert or update the index rows for a list of SharedPage entries."""
+    if not shared_pages:
+        return
+    CollectionAccess.objects.bulk_create(
+        [
+            CollectionAccess(
+                user_id=entry.shared_with_id,
+                collection_id=entry.page_id,
+                permission=entry.permission,
+            )
+            for entry in shared_pages
+        ],
+        ignore_conflicts=True,
+    )
+    # Rows that already existed keep their old permission after the insert above;
+    # bring them up to date, but never downgrade an owner row.
+    groups = {}
+    for entry in shared_pages:
+        groups.setdefault((entry.page_id, entry.permission), []).append(entry.shared_with_id)
+    for (collection_id, permission), user_ids in groups.items():
+        CollectionAccess.objects.filter(collection_id=collection_id, user_id__in=user_ids).exclude(
+            permission__in=["owner", permission]
+        ).update(permission=permission)
+
+
+def revoke_shared_access(collection_id, user_id):
+    CollectionAccess.objects.filter(collection_id=collection_id, user_id=user_id).exclude(
+        permission="owner"
+    ).delete()
+
+
+def rebuild_collection_access(collections):
+    """Recompute the index rows of the given collections from their owner and shares."""
+    collections = list(collections)
+    collection_ids = [collection.id for collection in collections]
+    rows = {
+        (user_id, collection_id): permission
+        for user_id, collection_id, permission in SharedPage.objects.filter(
+            page_id__in=collection_ids
+        ).values_list("shared_with_id", "page_id", "permission")
+    }
+    for collection in collections:
+        rows[(collection.owner_id, collection.id)] = "owner"
+
+    CollectionAccess.objects.filter(collection_id__in=collection_ids).delete()
+    CollectionAccess.objects.bulk_create(
+        [
+            CollectionAccess(user_id=user_id, collection_id=collection_id, permission=permission)
+            for (user_id, collection_id), permission in rows.items()
+        ],
+        batch_size=1000,
+    )
+    return len(rows)
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from pages.models import Collection
+from sharing.access import rebuild_collection_access
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the collection access index from collection owners and shared pages"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=500, help="Collections processed per transaction"
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        collection_ids = list(Collection.objects.order_by("id").values_list("id", flat=True))
+        total_rows = 0
+
+        for start in range(0, len(collection_ids), batch_size):
+            end = start + batch_size
+            batch = Collection.objects.filter(id__in=collection_ids[start:end])
+            with transaction.atomic():
+                total_rows += rebuild_collection_access(batch.only("id", "owner_id"))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt {total_rows} access rows for {len(collection_ids)} collections."
+            )
+        )
@@ -0,0 +1,40 @@
+# Generated by Django 5.2 on 2026-10-18 22:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("pages", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SharedPage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "permission",
+                    models.CharField(choices=[("view", "View"), ("edit", "Edit")], max_length=10),
+                ),
+                ("shared_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "page",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="shared_entries",
+                        to="pages.collection",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,40 @@
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+
+def backfill_collection_access(apps, schema_editor):
+    """Index every existing owner and share, as rebuild_collection_access does."""
+    Collection = apps.get_model("pages", "Collection")
+    SharedPage = apps.get_model("sharing", "SharedPage")
+    CollectionAccess = apps.get_model("sharing", "CollectionAccess")
+
+    rows = {
+        (user_id, collection_id): permission
+        for user_id, collection_id, permission in SharedPage.objects.values_list(
+            "shared_with_id", "page_id", "permission"
+        )
+    }
+    for collection_id, owner_id in Collection.objects.values_list("id", "owner_id"):
+        rows[(owner_id, collection_id)] = "owner"
+
+    CollectionAccess.objects.bulk_create(
+        [
+            CollectionAccess(user_id=user_id, collection_id=collection_id, permission=permission)
+            for (user_id, collection_id), permission in rows.items()
+        ],
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pages", "0002_initial"),
+        ("sharing", "0003_collection_access"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_collection_access, migrations.RunPython.noop),
+    ]
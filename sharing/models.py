@@ -16,3 +16,33 @@ class SharedPage(models.Model):
 
     class Meta:
         unique_together = ("page", "shared_with")
+
+
+ACCESS_CHOICES = (
+    ("owner", "Owner"),
+    ("view", "View"),
+    ("edit", "Edit"),
+)
+EDIT_ACCESS = ("owner", "edit")
+
+
+class CollectionAccess(models.Model):
+    """
+    Denormalized user -> collection access index.
+
+    One row per user that can reach a collection, either as its owner or through a
+    SharedPage entry. Rows are maintained by the signals in sharing/signals.py so
+    views can resolve access with a single indexed lookup.
+    """
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="collection_access")
+    collection = models.ForeignKey(
+        Collection, on_delete=models.CASCADE, related_name="access_entries"
+    )
+    permission = models.CharField(max_length=10, choices=ACCESS_CHOICES)
+
+    class Meta:
+        unique_together = ("user", "collection")
+
+    def __str__(self):
+        return f"{self.user} → {self.collection}: {self.permission}"
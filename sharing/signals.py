@@ -0,0 +1,36 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from pages.models import Collection
+from .access import grant_shared_access, rebuild_collection_access, revoke_shared_access
+from .models import CollectionAccess, SharedPage
+
+
+@receiver(post_save, sender=Collection)
+def collection_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        CollectionAccess.objects.create(
+            user_id=instance.owner_id, collection=instance, permission="owner"
+        )
+        return
+    # Ownership rarely changes; only rebuild when the owner row no longer matches.
+    if not CollectionAccess.objects.filter(
+        collection=instance, user_id=instance.owner_id, permission="owner"
+    ).exists():
+        with transaction.atomic():
+            rebuild_collection_access([instance])
+
+
+@receiver(post_save, sender=SharedPage)
+def shared_page_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    grant_shared_access([instance])
+
+
+@receiver(post_delete, sender=SharedPage)
+def shared_page_deleted(sender, instance, **kwargs):
+    revoke_shared_access(instance.page_id, instance.shared_with_id)
@@ -1,3 +1,93 @@
-from django.test import TestCase
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+from django.urls import reverse
+from rest_framework import status
+from pages.models import Collection
+from sharing.models import CollectionAccess, SharedPage
+from users.tests import BaseAPITestCase
 
-# Create your tests here.
+
+class CollectionAccessIndexTests(BaseAPITestCase):
+    def access(self, user, collection):
+        return (
+            CollectionAccess.objects.filter(user=user, collection=collection)
+            .values_list("permission", flat=True)
+            .first()
+        )
+
+    def test_owner_row_created_with_collection(self):
+        self.assertEqual(self.access(self.user1, self.collection1), "owner")
+        self.assertEqual(self.access(self.user2, self.collection2), "owner")
+
+    def test_shared_page_changes_are_indexed(self):
+        self.assertEqual(self.access(self.user2, self.collection1), "edit")
+
+        shared = SharedPage.objects.get(page=self.collection1, shared_with=self.user2)
+        shared.permission = "view"
+        shared.save()
+        self.assertEqual(self.access(self.user2, self.collection1), "view")
+
+        shared.delete()
+        self.assertIsNone(self.access(self.user2, self.collection1))
+
+    def test_sharing_with_owner_does_not_downgrade_owner_row(self):
+        SharedPage.objects.create(page=self.collection2, shared_with=self.user2, permission="view")
+        self.assertEqual(self.access(self.user2, self.collection2), "owner")
+
+    def test_owner_change_rebuilds_collection_rows(self):
+        self.collection2.owner = self.user1
+        self.collection2.save()
+        self.assertEqual(self.access(self.user1, self.collection2), "owner")
+        self.assertIsNone(self.access(self.user2, self.collection2))
+
+    def test_unshare_all_removes_rows(self):
+        self.client.force_authenticate(user=self.user1)
+        response = self.client.post(reverse("unshare-all-users", args=[self.collection1.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(self.access(self.user2, self.collection1))
+
+        self.client.force_authenticate(user=self.user2)
+        response = self.client.get(reverse("tasks-list"))
+        titles = [task["title"] for task in response.data]
+        self.assertNotIn("Task 1 in Collection 1", titles)
+
+    def test_rebuild_command_restores_index(self):
+        CollectionAccess.objects.all().delete()
+        call_command("rebuild_collection_access", stdout=StringIO())
+        self.assertEqual(self.access(self.user1, self.collection1), "owner")
+        self.assertEqual(self.access(self.user2, self.collection1), "edit")
+        self.assertEqual(CollectionAccess.objects.count(), Collection.objects.count() + 1)
+
+
+class CollectionAccessBackfillMigrationTests(TransactionTestCase):
+    before = [("sharing", "0003_collection_access")]
+    after = [("sharing", "0004_backfill_collection_access")]
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_backfill_indexes_existing_owners_and_shares(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.before)
+        apps = executor.loader.project_state(self.before).apps
+        User = apps.get_model("users", "User")
+        owner = User.objects.create(username="owner")
+        guest = User.objects.create(username="guest")
+        collection = apps.get_model("pages", "Collection").objects.create(
+            title="Existing", owner=owner
+        )
+        apps.get_model("sharing", "SharedPage").objects.create(
+            page=collection, shared_with=guest, permission="view"
+        )
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.after)
+
+        self.assertEqual(
+            set(CollectionAccess.objects.values_list("user__username", "permission")),
+            {("owner", "owner"), ("guest", "view")},
+        )
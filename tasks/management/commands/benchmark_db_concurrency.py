@@ -0,0 +1,150 @@
+import random
+import statistics
+import threading
+import time as timer
+from datetime import date, time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections, transaction
+
+from pages.models import Collection
+from tasks.models import Task
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs concurrent task reads and writes against the configured database and "
+        "reports throughput, latency and 'database is locked' errors. Generated rows are "
+        "deleted at the end."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", default="1,4,16", help="Comma separated thread counts to measure"
+        )
+        parser.add_argument("--duration", type=float, default=5, help="Seconds per run")
+        parser.add_argument(
+            "--write-ratio", type=float, default=0.2, help="Share of operations that write"
+        )
+        parser.add_argument(
+            "--sqlite-profile",
+            choices=["settings", "django-default"],
+            default="settings",
+            help=(
+                "SQLite only: 'settings' uses the configured pragmas, 'django-default' a "
+                "plain connection (rollback journal, deferred transactions, 5s timeout)"
+            ),
+        )
+
+    def handle(self, *args, **options):
+        profile = options["sqlite_profile"]
+        if profile != "settings" and connection.vendor != "sqlite":
+            raise CommandError("--sqlite-profile only applies to SQLite.")
+
+        user = User.objects.create_user(username="__concurrency_benchmark__", password=None)
+        collection = Collection.objects.create(title="Concurrency benchmark", owner=user)
+        # Worker threads build their connections from this same dict
+        db_options = connection.settings_dict["OPTIONS"]
+        options_before = dict(db_options)
+        if profile == "django-default":
+            db_options.clear()
+            db_options["timeout"] = 5
+            connection.close()
+            with connection.cursor() as cursor:
+                cursor.execute("PRAGMA journal_mode=DELETE")
+        try:
+            self.stdout.write(self._describe())
+            self.stdout.write(
+                f"{'workers':>7} {'ops/s':>8} {'reads':>7} {'writes':>7} {'errors':>7} "
+                f"{'p50 ms':>7} {'p95 ms':>7}"
+            )
+            for workers in sorted(int(value) for value in options["workers"].split(",")):
+                self._run(user, collection, workers, options["duration"], options["write_ratio"])
+        finally:
+            if profile != "settings":
+                db_options.clear()
+                db_options.update(options_before)
+                connection.close()  # reconnect with the configured init_command
+            user.delete()
+
+        self.stdout.write(self.style.SUCCESS("Done; benchmark data deleted."))
+
+    def _describe(self):
+        if connection.vendor != "sqlite":
+            return connection.vendor
+        with connection.cursor() as cursor:
+            values = []
+            for pragma in ("journal_mode", "synchronous", "busy_timeout", "cache_size"):
+                cursor.execute(f"PRAGMA {pragma}")
+                values.append(f"{pragma}={cursor.fetchone()[0]}")
+        mode = connection.settings_dict["OPTIONS"].get("transaction_mode", "DEFERRED")
+        return f"sqlite, {', '.join(values)}, transaction_mode={mode}"
+
+    def _run(self, user, collection, workers, duration, write_ratio):
+        latencies, counts = [], {"reads": 0, "writes": 0, "errors": 0}
+        lock = threading.Lock()
+        deadline = [0]
+
+        def set_deadline():
+            deadline[0] = timer.perf_counter() + duration
+
+        # Release all threads together, then run for ``duration`` seconds
+        start = threading.Barrier(workers, action=set_deadline)
+
+        def worker(seed):
+            rng = random.Random(seed)
+            local, local_counts = [], {"reads": 0, "writes": 0, "errors": 0}
+            try:
+                start.wait()
+                while timer.perf_counter() < deadline[0]:
+                    write = rng.random() < write_ratio
+                    started = timer.perf_counter()
+                    try:
+                        if write:
+                            self._write(user, collection, rng)
+                        else:
+                            list(collection.tasks.order_by("-id")[:50])
+                    except OperationalError:
+                        local_counts["errors"] += 1
+                        continue
+                    local.append((timer.perf_counter() - started) * 1000)
+                    local_counts["writes" if write else "reads"] += 1
+            finally:
+                connections.close_all()  # this thread's connections
+            with lock:
+                latencies.extend(local)
+                for key, value in local_counts.items():
+                    counts[key] += value
+
+        threads = [threading.Thread(target=worker, args=(index,)) for index in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        latencies.sort()
+        operations = counts["reads"] + counts["writes"]
+        p50 = statistics.median(latencies) if latencies else 0
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0
+        self.stdout.write(
+            f"{workers:>7} {operations / duration:>8.1f} {counts['reads']:>7} "
+            f"{counts['writes']:>7} {counts['errors']:>7} {p50:>7.2f} {p95:>7.2f}"
+        )
+
+    def _write(self, user, collection, rng):
+        """Toggle the newest task and add one, reading before writing like the views do."""
+        hour = rng.randrange(24)
+        with transaction.atomic():
+            latest = collection.tasks.order_by("-id").values("id", "completed").first()
+            if latest:
+                Task.objects.filter(id=latest["id"]).update(completed=not latest["completed"])
+            Task.objects.create(
+                owner=user,
+                collection=collection,
+                title="Concurrency benchmark",
+                due_date=date.today() + timedelta(days=rng.randrange(30)),
+                start_time=time(hour),
+                end_time=time(hour, 30),
+                category="Benchmark",
+            )
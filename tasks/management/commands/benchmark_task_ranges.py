@@ -0,0 +1,98 @@
+import statistics
+import time as timer
+from datetime import date, time, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from pages.models import Collection
+from tasks.models import Task
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures calendar range queries against growing task tables. "
+        "All generated rows are rolled back at the end."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scales",
+            default="1000,10000,100000",
+            help="Comma separated total task counts to measure",
+        )
+        parser.add_argument("--collections", type=int, default=20)
+        parser.add_argument("--window-days", type=int, default=31)
+        parser.add_argument(
+            "--per-day", type=int, default=10, help="Tasks generated per calendar day"
+        )
+        parser.add_argument("--repeat", type=int, default=20, help="Query runs per scale")
+        parser.add_argument(
+            "--explain", action="store_true", help="Print the query plan for each scale"
+        )
+
+    def handle(self, *args, **options):
+        scales = sorted(int(value) for value in options["scales"].split(","))
+        window_start = date.today()
+        window_end = window_start + timedelta(days=options["window_days"] - 1)
+
+        with transaction.atomic():
+            user = User.objects.create_user(username="__range_benchmark__", password=None)
+            collections = [
+                Collection.objects.create(title=f"Benchmark {index}", owner=user)
+                for index in range(options["collections"])
+            ]
+            created = 0
+            self.stdout.write(f"{'tasks':>10} {'rows':>7} {'median ms':>10} {'p95 ms':>8}")
+
+            for scale in scales:
+                created += self._seed(
+                    user, collections, window_end, options["per_day"], created, scale - created
+                )
+                queryset = Task.objects.filter(
+                    collection__access_entries__user=user,
+                    due_date__gte=window_start,
+                    due_date__lte=window_end,
+                ).select_related("owner")
+
+                timings = []
+                rows = 0
+                for _ in range(options["repeat"]):
+                    started = timer.perf_counter()
+                    rows = len(list(queryset.all()))
+                    timings.append((timer.perf_counter() - started) * 1000)
+                timings.sort()
+                p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+                self.stdout.write(
+                    f"{scale:>10} {rows:>7} {statistics.median(timings):>10.2f} {p95:>8.2f}"
+                )
+                if options["explain"]:
+                    self.stdout.write(queryset.explain())
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS(f"Done ({connection.vendor}); data rolled back."))
+
+    def _seed(self, user, collections, last_day, per_day, offset, count):
+        """
+        Fill days backwards from ``last_day`` at a constant density, so once the window
+        is covered it always holds the same number of rows while the table keeps growing.
+        """
+        if count <= 0:
+            return 0
+        tasks = []
+        for index in range(offset, offset + count):
+            tasks.append(
+                Task(
+                    owner=user,
+                    collection=collections[index % len(collections)],
+                    title=f"Task {index}",
+                    due_date=last_day - timedelta(days=index // per_day),
+                    start_time=time(index % 24),
+                    end_time=time(index % 24, 30),
+                    category="Benchmark",
+                )
+            )
+        Task.objects.bulk_create(tasks, batch_size=2000)
+        return count
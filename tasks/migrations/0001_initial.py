@@ -0,0 +1,49 @@
+# Generated by Django 5.2 on 2026-10-18 20:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("pages", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Task",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("title", models.CharField(max_length=255)),
+                ("details", models.TextField(blank=True, null=True)),
+                ("due_date", models.DateField()),
+                ("start_time", models.TimeField()),
+                ("end_time", models.TimeField()),
+                ("category", models.CharField(max_length=100)),
+                (
+                    "color",
+                    models.CharField(blank=True, default="#039be5", max_length=30, null=True),
+                ),
+                ("task_icon", models.ImageField(blank=True, null=True, upload_to="task_icons/")),
+                ("completed", models.BooleanField(default=False)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "collection",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="tasks",
+                        to="pages.collection",
+                    ),
+                ),
+            ],
+        ),
+    ]
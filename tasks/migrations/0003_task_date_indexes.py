@@ -0,0 +1,27 @@
+# Generated by Django 5.2 on 2026-10-18 22:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pages", "0002_initial"),
+        ("tasks", "0002_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["collection", "due_date", "start_time"],
+                name="tasks_task_collect_0b1503_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(fields=["owner", "due_date"], name="tasks_task_owner_i_3addd0_idx"),
+        ),
+    ]
@@ -22,5 +22,12 @@ class Task(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     collection = models.ForeignKey(Collection, on_delete=models.CASCADE, related_name="tasks")
 
+    class Meta:
+        indexes = [
+            # Calendar range queries: tasks of a collection inside a date window
+            models.Index(fields=["collection", "due_date", "start_time"]),
+            models.Index(fields=["owner", "due_date"]),
+        ]
+
     def __str__(self):
         return self.title
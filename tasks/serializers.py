@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from pages.models import Collection
 from .models import Task
 
 
@@ -14,5 +15,30 @@ class TaskSerializer(serializers.ModelSerializer):
             "updated_at",
         ]
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Sparse fieldsets: GET /api/tasks/?fields=id,title,due_date
+        request = self.context.get("request")
+        if request is not None and request.method == "GET":
+            requested = request.query_params.get("fields")
+            if requested:
+                allowed = {name.strip() for name in requested.split(",") if name.strip()}
+                for name in set(self.fields) - allowed:
+                    self.fields.pop(name)
+
     def get_owner(self, obj):
         return obj.owner.username
+
+
+class PreloadedCollectionField(serializers.PrimaryKeyRelatedField):
+    """Resolves the collection from ``context["collections"]`` instead of one query per item."""
+
+    def to_internal_value(self, data):
+        try:
+            return self.context["collections"][int(data)]
+        except (KeyError, TypeError, ValueError):
+            self.fail("does_not_exist", pk_value=data)
+
+
+class TaskBulkSerializer(TaskSerializer):
+    collection = PreloadedCollectionField(queryset=Collection.objects.all())
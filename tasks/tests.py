@@ -1,5 +1,13 @@
+import base64
+import json
+import os
+import tempfile
+import unittest
 import uuid
 from datetime import datetime, timedelta
+from django.db import connection, connections
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase, APIClient
@@ -168,3 +176,202 @@ class LinkSharingTasksTests(BaseAPITestCase):
         # There should be one task in the response
         self.assertEqual(len(response.data), 1)
         self.assertEqual(response.data[0]['title'], "Task in Link Shared Collection")
+
+
+class TaskPaginationTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.user1)
+        today = datetime.now().date()
+        for index in range(5):
+            Task.objects.create(
+                title=f"Paged Task {index}",
+                due_date=today + timedelta(days=index % 2),
+                start_time="09:00:00",
+                end_time="10:00:00",
+                category="Work",
+                collection=self.collection1,
+                owner=self.user1,
+            )
+
+    def test_list_without_pagination_params_returns_plain_list(self):
+        response = self.client.get(reverse("tasks-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 6)
+
+    def test_cursor_pages_cover_every_task_in_order(self):
+        url = reverse("tasks-list") + "?page_size=4"
+        seen = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data["results"]), 4)
+            seen.extend(response.data["results"])
+            url = response.data["next"]
+
+        self.assertEqual(len(seen), 6)
+        keys = [(task["due_date"], task["id"]) for task in seen]
+        self.assertEqual(keys, sorted(keys))
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get(reverse("tasks-list") + "?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_tampered_cursor_returns_404(self):
+        for values in (["garbage", 1], ["2026-01-01", "x"], [None, 1], [{"a": 1}, 1]):
+            cursor = base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+            response = self.client.get(reverse("tasks-list") + f"?cursor={cursor}")
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, values)
+
+    def test_sparse_fieldset(self):
+        response = self.client.get(reverse("tasks-list") + "?fields=id,title")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data[0]), {"id", "title"})
+
+    def test_owner_is_loaded_with_tasks(self):
+        # A single query: tasks joined with the access index and their owner
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("tasks-list") + "?page_size=10")
+        self.assertEqual(len(response.data["results"]), 6)
+
+
+class TaskCalendarTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.user1)
+        Task.objects.filter(collection=self.collection1).delete()
+        for day in ("2026-03-02", "2026-03-04", "2026-03-10", "2026-04-01"):
+            Task.objects.create(
+                title=f"Task on {day}",
+                due_date=day,
+                start_time="09:00:00",
+                end_time="10:00:00",
+                category="Work",
+                collection=self.collection1,
+                owner=self.user1,
+            )
+
+    def test_list_filtered_by_date_window(self):
+        response = self.client.get(reverse("tasks-list") + "?from=2026-03-03&to=2026-03-10")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            sorted(task["due_date"] for task in response.data), ["2026-03-04", "2026-03-10"]
+        )
+
+    def test_invalid_date_window(self):
+        response = self.client.get(reverse("tasks-list") + "?from=march")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(reverse("tasks-list") + "?from=2026-03-10&to=2026-03-01")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_calendar_week_buckets(self):
+        url = reverse("tasks-calendar") + "?from=2026-03-01&to=2026-03-15&bucket=week"
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        buckets = [(str(b["start"]), b["count"]) for b in response.data["buckets"]]
+        self.assertEqual(buckets, [("2026-02-23", 0), ("2026-03-02", 2), ("2026-03-09", 1)])
+
+    def test_calendar_month_buckets(self):
+        url = reverse("tasks-calendar") + "?from=2026-03-01&to=2026-04-30&bucket=month"
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        buckets = [(str(b["start"]), str(b["end"]), b["count"]) for b in response.data["buckets"]]
+        self.assertEqual(
+            buckets, [("2026-03-01", "2026-03-31", 3), ("2026-04-01", "2026-04-30", 1)]
+        )
+
+    def test_calendar_requires_window(self):
+        response = self.client.get(reverse("tasks-calendar"))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TaskBulkTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.user2)
+        self.url = reverse("tasks-bulk")
+
+    def task_data(self, title, collection):
+        return {
+            "title": title,
+            "due_date": "2026-05-01",
+            "start_time": "09:00:00",
+            "end_time": "10:00:00",
+            "category": "Work",
+            "collection": collection.id,
+        }
+
+    def test_mixed_operations(self):
+        operations = [
+            {"op": "create", "data": self.task_data("Bulk A", self.collection1)},
+            {"op": "create", "data": self.task_data("Bulk B", self.collection2)},
+            {"op": "update", "id": self.task1.id, "data": {"completed": True}},
+            {"op": "delete", "id": self.task2.id},
+        ]
+        response = self.client.post(self.url, {"operations": operations}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        statuses = [result["status"] for result in response.data["results"]]
+        self.assertEqual(statuses, [201, 201, 200, 204])
+
+        self.assertTrue(Task.objects.filter(title="Bulk A", owner=self.user2).exists())
+        self.task1.refresh_from_db()
+        self.assertTrue(self.task1.completed)
+        self.assertFalse(Task.objects.filter(id=self.task2.id).exists())
+
+    def test_per_item_errors_do_not_block_valid_items(self):
+        shared = SharedPage.objects.get(page=self.collection1, shared_with=self.user2)
+        shared.permission = "view"
+        shared.save()
+
+        operations = [
+            {"op": "create", "data": self.task_data("Denied", self.collection1)},
+            {"op": "create", "data": {"title": "Missing fields"}},
+            {"op": "update", "id": 999999, "data": {"title": "Nope"}},
+            {"op": "archive", "id": self.task2.id},
+            {"op": "create", "data": self.task_data("Allowed", self.collection2)},
+        ]
+        response = self.client.post(self.url, {"operations": operations}, format="json")
+        statuses = [result["status"] for result in response.data["results"]]
+        self.assertEqual(statuses, [403, 400, 404, 400, 201])
+        self.assertFalse(Task.objects.filter(title="Denied").exists())
+        self.assertTrue(Task.objects.filter(title="Allowed").exists())
+
+    def test_query_count_does_not_grow_with_operations(self):
+        def run(count):
+            operations = [
+                {"op": "create", "data": self.task_data(f"Task {i}", self.collection2)}
+                for i in range(count)
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(self.url, {"operations": operations}, format="json")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return len(queries)
+
+        self.assertEqual(run(2), run(40))
+
+    def test_rejects_empty_payload(self):
+        response = self.client.post(self.url, {"operations": []}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@unittest.skipUnless(connection.vendor == "sqlite", "SQLite connection settings")
+class SQLitePragmaTests(SimpleTestCase):
+    def test_new_connections_are_tuned(self):
+        with tempfile.TemporaryDirectory() as directory:
+            settings_dict = {**connection.settings_dict, "NAME": os.path.join(directory, "t.db")}
+            wrapper = connections["default"].__class__(settings_dict, alias="pragma_check")
+            try:
+                with wrapper.cursor() as cursor:
+                    pragmas = {}
+                    for name in ("journal_mode", "synchronous", "temp_store", "cache_size"):
+                        cursor.execute(f"PRAGMA {name}")
+                        pragmas[name] = cursor.fetchone()[0]
+            finally:
+                wrapper.close()
+
+        self.assertEqual(pragmas["journal_mode"], "wal")
+        self.assertEqual(pragmas["synchronous"], 1)  # NORMAL
+        self.assertEqual(pragmas["temp_store"], 2)  # MEMORY
+        self.assertLess(pragmas["cache_size"], -2000)  # larger than SQLite's default
+        self.assertEqual(settings_dict["OPTIONS"]["transaction_mode"], "IMMEDIATE")
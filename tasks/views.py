@@ -1,57 +1,263 @@
 # views.py (Django)
+from datetime import timedelta
 from rest_framework import viewsets, permissions
-from rest_framework.exceptions import PermissionDenied
-from django.db.models import Q
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.response import Response
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from .models import Task
-from .serializers import TaskSerializer
-from sharing.models import SharedPage
+from .serializers import TaskBulkSerializer, TaskSerializer
+from sharing.access import can_edit, get_permission
+from sharing.models import EDIT_ACCESS, CollectionAccess
 from pages.models import Collection
+from Chat.context import bump_collection_versions
+from life_tracker_backend.pagination import KeysetPagination
+
+
+def bucket_start(day, bucket):
+    if bucket == "month":
+        return day.replace(day=1)
+    return day - timedelta(days=day.weekday())
+
+
+def bucket_end(start, bucket):
+    if bucket == "month":
+        next_month = (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+        return next_month - timedelta(days=1)
+    return start + timedelta(days=6)
+
+
+class TaskPagination(KeysetPagination):
+    ordering = ("due_date", "id")
 
 
 class TaskViewSet(viewsets.ModelViewSet):
     serializer_class = TaskSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = TaskPagination
+    # Longest window the calendar endpoint will bucket in one request
+    max_calendar_days = 366
+    # Largest number of operations accepted by the bulk endpoint
+    max_bulk_operations = 1000
 
     def get_queryset(self):
+        # The serializer renders the owner's username for every task
+        queryset = self.get_accessible_tasks().select_related("owner")
+        date_from, date_to = self.get_date_window()
+        if date_from:
+            queryset = queryset.filter(due_date__gte=date_from)
+        if date_to:
+            queryset = queryset.filter(due_date__lte=date_to)
+        return queryset
+
+    def get_date_window(self):
+        """Parse the optional ?from=YYYY-MM-DD&to=YYYY-MM-DD window (both inclusive)."""
+        window = []
+        for param in ("from", "to"):
+            value = self.request.query_params.get(param)
+            parsed = None
+            if value:
+                try:
+                    parsed = parse_date(value)
+                except ValueError:
+                    parsed = None
+                if parsed is None:
+                    raise ValidationError({param: "Date must be in YYYY-MM-DD format."})
+            window.append(parsed)
+        if window[0] and window[1] and window[0] > window[1]:
+            raise ValidationError({"to": "End date must not be before the start date."})
+        return window
+
+    @action(detail=False, methods=["get"])
+    def calendar(self, request):
+        """
+        Tasks inside ?from=&to=, grouped into ``week`` (Monday based) or ``month``
+        buckets with ?bucket=. Empty buckets are included so calendars can render
+        every cell from one response.
+        """
+        bucket = request.query_params.get("bucket", "week")
+        if bucket not in ("week", "month"):
+            raise ValidationError({"bucket": "Bucket must be 'week' or 'month'."})
+        date_from, date_to = self.get_date_window()
+        if not date_from or not date_to:
+            raise ValidationError({"detail": "Both 'from' and 'to' are required."})
+        if (date_to - date_from).days >= self.max_calendar_days:
+            raise ValidationError(
+                {"detail": f"The window cannot exceed {self.max_calendar_days} days."}
+            )
+
+        tasks = list(self.get_queryset().order_by("due_date", "start_time", "id"))
+        buckets = {}
+        start = bucket_start(date_from, bucket)
+        while start <= date_to:
+            end = bucket_end(start, bucket)
+            buckets[start] = {"start": start, "end": end, "tasks": []}
+            start = end + timedelta(days=1)
+
+        serializer = self.get_serializer(tasks, many=True)
+        for task, data in zip(tasks, serializer.data):
+            buckets[bucket_start(task.due_date, bucket)]["tasks"].append(data)
+
+        results = []
+        for entry in buckets.values():
+            entry["count"] = len(entry["tasks"])
+            results.append(entry)
+        return Response(
+            {"from": date_from, "to": date_to, "bucket": bucket, "buckets": results}
+        )
+
+    def get_accessible_tasks(self):
         user = self.request.user
-        # Get all collections the user can access
-        # Only include collections that are:
-        # 1. Owned by the user
-        # 2. Explicitly shared with the user via SharedPage
-        # 3. Don't include link-shareable collections by default - they should only be accessible after visiting the shared link
-        accessible_collections = Collection.objects.filter(
-            Q(owner=user)
-            | Q(shared_entries__shared_with=user)
-        ).distinct()
-
-        # Filter tasks based on collection access and optional collection filter
+        # Accessible collections come from the precomputed access index, which holds
+        # one row per collection the user owns or that was explicitly shared with them.
+        # Link-shareable collections are not included until the user adds them.
         collection_id = self.request.query_params.get("collection")
         if collection_id:
-            # For specific collection requests, check if it's a link-shareable collection separately
-            # This allows direct API calls to still work when needed
+            # For specific collection requests, also allow link-shareable collections
+            # so direct API calls still work when needed
             collection = Collection.objects.filter(id=collection_id).first()
             if collection and (
-                collection.owner == user 
-                or SharedPage.objects.filter(page=collection, shared_with=user).exists()
-                or (collection_id and collection.is_link_shareable and collection.shareable_permission in ["view", "edit"])
+                get_permission(user, collection)
+                or (
+                    collection.is_link_shareable
+                    and collection.shareable_permission in ["view", "edit"]
+                )
             ):
                 return Task.objects.filter(collection=collection_id)
             return Task.objects.none()
 
-        return Task.objects.filter(collection__in=accessible_collections)
+        return Task.objects.filter(collection__access_entries__user=user)
 
     def perform_create(self, serializer):
         collection = serializer.validated_data["collection"]
         user = self.request.user
 
-        # Owner can always create tasks
-        if collection.owner == user:
-            serializer.save(owner=user, collection=collection)
-            return
-
-        # Check for edit permission through sharing
-        if SharedPage.objects.filter(page=collection, shared_with=user, permission="edit").exists():
+        # Owners and users shared with edit permission can create tasks
+        if can_edit(user, collection):
             serializer.save(owner=user, collection=collection)
             return
 
         raise PermissionDenied("You don't have permission to create tasks here.")
+
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        """
+        Create, update and delete many tasks in one request.
+
+        Body: ``{"operations": [{"op": "create", "data": {...}},
+        {"op": "update", "id": 1, "data": {...}}, {"op": "delete", "id": 2}]}``.
+        Permissions are resolved with one query for every collection involved and all
+        valid operations are written in a single transaction. Each operation gets its
+        own entry in ``results``; invalid ones are reported and skipped.
+        """
+        operations = request.data.get("operations") if isinstance(request.data, dict) else None
+        if not isinstance(operations, list) or not operations:
+            raise ValidationError({"operations": "Provide a non-empty list of operations."})
+        if len(operations) > self.max_bulk_operations:
+            raise ValidationError(
+                {"operations": f"At most {self.max_bulk_operations} operations are allowed."}
+            )
+
+        user = request.user
+        results = [None] * len(operations)
+
+        def fail(index, op, code, errors):
+            results[index] = {"index": index, "op": op, "status": code, "errors": errors}
+
+        # Load every referenced task and collection, and the user's access to them, up front
+        task_ids = set()
+        collection_ids = set()
+        for item in operations:
+            if not isinstance(item, dict):
+                continue
+            if isinstance(item.get("id"), int):
+                task_ids.add(item["id"])
+            data = item.get("data")
+            if isinstance(data, dict) and str(data.get("collection", "")).isdigit():
+                collection_ids.add(int(data["collection"]))
+        tasks = Task.objects.select_related("owner").in_bulk(task_ids)
+        collection_ids.update(task.collection_id for task in tasks.values())
+        collections = Collection.objects.in_bulk(collection_ids)
+        permissions_by_collection = dict(
+            CollectionAccess.objects.filter(
+                user=user, collection_id__in=collection_ids
+            ).values_list("collection_id", "permission")
+        )
+        context = {"request": request, "collections": collections}
+
+        to_create, to_update, to_delete = [], [], []
+        update_fields = set()
+        for index, item in enumerate(operations):
+            op = item.get("op") if isinstance(item, dict) else None
+            if op not in ("create", "update", "delete"):
+                fail(index, op, 400, {"op": "Must be 'create', 'update' or 'delete'."})
+                continue
+
+            if op == "create":
+                serializer = TaskBulkSerializer(data=item.get("data"), context=context)
+                if not serializer.is_valid():
+                    fail(index, op, 400, serializer.errors)
+                    continue
+                collection = serializer.validated_data["collection"]
+                if permissions_by_collection.get(collection.id) not in EDIT_ACCESS:
+                    fail(index, op, 403, {"detail": "No permission to create tasks here."})
+                    continue
+                to_create.append((index, Task(owner=user, **serializer.validated_data)))
+                continue
+
+            task = tasks.get(item.get("id"))
+            if task is None or task.collection_id not in permissions_by_collection:
+                fail(index, op, 404, {"detail": "Task not found."})
+                continue
+            if permissions_by_collection[task.collection_id] not in EDIT_ACCESS:
+                fail(index, op, 403, {"detail": "You don't have permission to modify this task."})
+                continue
+
+            if op == "delete":
+                to_delete.append((index, task))
+                continue
+
+            serializer = TaskBulkSerializer(
+                task, data=item.get("data"), partial=True, context=context
+            )
+            if not serializer.is_valid():
+                fail(index, op, 400, serializer.errors)
+                continue
+            new_collection = serializer.validated_data.get("collection")
+            new_permission = new_collection and permissions_by_collection.get(new_collection.id)
+            if new_collection and new_permission not in EDIT_ACCESS:
+                fail(index, op, 403, {"detail": "You don't have permission to move tasks there."})
+                continue
+            for field, value in serializer.validated_data.items():
+                setattr(task, field, value)
+            update_fields.update(serializer.validated_data)
+            to_update.append((index, task))
+
+        now = timezone.now()
+        with transaction.atomic():
+            if to_create:
+                Task.objects.bulk_create([task for _, task in to_create])
+            if to_update:
+                for _, task in to_update:
+                    task.updated_at = now
+                Task.objects.bulk_update(
+                    list({task.id: task for _, task in to_update}.values()),
+                    sorted(update_fields | {"updated_at"}),
+                )
+            if to_delete:
+                Task.objects.filter(id__in=[task.id for _, task in to_delete]).delete()
+        if to_create or to_update:
+            # bulk_create/bulk_update skip the signals that expire cached chat context
+            bump_collection_versions(permissions_by_collection)
+
+        written = [(index, "create", 201, task) for index, task in to_create]
+        written += [(index, "update", 200, task) for index, task in to_update]
+        serialized = TaskSerializer([task for *_, task in written], many=True).data
+        for (index, op, code, task), data in zip(written, serialized):
+            results[index] = {"index": index, "op": op, "status": code, "id": task.id, "data": data}
+        for index, task in to_delete:
+            results[index] = {"index": index, "op": "delete", "status": 204, "id": task.id}
+
+        return Response({"results": results})
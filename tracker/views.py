@@ -4,7 +4,7 @@ from rest_framework.response import Response
 from rest_framework import status
 from django.db.models import Q
 from .models import Note, Task
-from sharing.models import SharedPage
+from sharing.access import accessible_collection_ids, can_edit, get_permission
 from .serializers import NoteSerializer
 
 
@@ -12,12 +12,8 @@ def has_edit_permission(user, task):
     """Check if user has edit permissions for the task's collection"""
     collection = task.collection
 
-    # Owner has full permissions
-    if collection.owner == user:
-        return True
-
-    # Check shared edit permission
-    if SharedPage.objects.filter(page=collection, shared_with=user, permission="edit").exists():
+    # Owners and users shared with edit permission
+    if can_edit(user, collection):
         return True
 
     # Check link-based edit permission
@@ -32,12 +28,11 @@ def notes_list(request):
     if request.method == "GET":
         # Get all tasks the user can access
         accessible_tasks = Task.objects.filter(
-            Q(collection__owner=request.user)
-            | Q(collection__shared_entries__shared_with=request.user)
+            Q(collection__in=accessible_collection_ids(request.user))
             | Q(collection__is_link_shareable=True)
-        ).distinct()
+        )
 
-        notes = Note.objects.filter(task__in=accessible_tasks)
+        notes = Note.objects.filter(task__in=accessible_tasks).select_related("user")
 
         # Filter by task if specified
         task_id = request.query_params.get("task")
@@ -67,17 +62,13 @@ def notes_list(request):
 @api_view(["GET", "PUT", "DELETE"])
 def note_detail(request, pk):
     try:
-        note = Note.objects.get(pk=pk)
+        note = Note.objects.select_related("task__collection").get(pk=pk)
         task = note.task
     except Note.DoesNotExist:
         return Response({"detail": "Note not found."}, status=status.HTTP_404_NOT_FOUND)
 
     # Check base view permission
-    has_access = (
-        task.collection.owner == request.user
-        or task.collection.shared_entries.filter(shared_with=request.user).exists()
-        or task.collection.is_link_shareable
-    )
+    has_access = task.collection.is_link_shareable or get_permission(request.user, task.collection)
 
     if not has_access:
         return Response({"detail": "Note not found."}, status=status.HTTP_404_NOT_FOUND)
@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.utils.html import format_html
-from .models import User, EmailVerificationToken, PasswordResetToken
+from .models import User, EmailVerificationToken, PasswordResetToken, OutgoingEmail
 
 class CustomUserAdmin(UserAdmin):
     list_display = ('full_name', 'username', 'email', 'is_active', 'date_joined', 'display_profile_picture')
@@ -71,6 +71,17 @@ class PasswordResetTokenAdmin(admin.ModelAdmin):
     def has_add_permission(self, request):
         return False
 
+
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        'subject', 'to', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at'
+    )
+    search_fields = ('subject', 'to')
+    list_filter = ('status', 'created_at')
+    readonly_fields = ('claim_token', 'claimed_at', 'created_at', 'sent_at', 'last_error')
+
+
 admin.site.register(User, CustomUserAdmin)
 admin.site.register(EmailVerificationToken, EmailVerificationTokenAdmin)
 admin.site.register(PasswordResetToken, PasswordResetTokenAdmin)
+admin.site.register(OutgoingEmail, OutgoingEmailAdmin)
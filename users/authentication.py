@@ -0,0 +1,169 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+# User fields written into every access token, enough to build request.user in
+# "claims" mode
+USER_CLAIMS = ("username", "is_staff", "is_superuser")
+
+
+def user_cache_key(user_id):
+    return f"auth:user:{user_id}"
+
+
+def invalidate_user(user_id):
+    cache.delete(user_cache_key(user_id))
+
+
+class UserRefreshToken(RefreshToken):
+    """
+    RefreshToken whose access tokens carry USER_CLAIMS, read from ``user`` when each
+    access token is issued. The refresh token itself never carries them (nor copies
+    them from tokens issued before): it outlives a rename or a demotion by weeks.
+    """
+
+    no_copy_claims = (*RefreshToken.no_copy_claims, *USER_CLAIMS)
+    user = None
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token.user = user
+        return token
+
+    @property
+    def access_token(self):
+        access = super().access_token
+        if self.user is not None:
+            for claim in USER_CLAIMS:
+                access[claim] = getattr(self.user, claim)
+        return access
+
+
+class UserTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    TokenRefreshSerializer whose access tokens get USER_CLAIMS from the user row it
+    loads to check the account is still active.
+    """
+
+    token_class = UserRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM)
+        user = (
+            get_user_model().objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+            if user_id
+            else None
+        )
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(
+                self.error_messages["no_active_account"], "no_active_account"
+            )
+        refresh.user = user
+        data = {"access": str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                try:
+                    refresh.blacklist()
+                except AttributeError:
+                    # Only available with the token_blacklist app installed
+                    pass
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
+            data["refresh"] = str(refresh)
+        return data
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication whose user lookup follows JWT_USER_SOURCE:
+
+    - "database": load the user row on every request, like simplejwt does.
+    - "cache": keep the row in the cache for JWT_USER_CACHE_TIMEOUT seconds. Saving or
+      deleting the user clears it (see users.signals), so profile, password and
+      deactivation changes apply on the next request.
+    - "claims": build the user from the token without a query. Only the id and
+      USER_CLAIMS are loaded; other fields are fetched when first read. Deactivation,
+      password, username and staff changes only apply once the access token expires:
+      refreshing reloads the claims from the user. Tokens issued without the claims
+      fall back to "cache".
+    """
+
+    def get_user(self, validated_token):
+        source = settings.JWT_USER_SOURCE
+        if source == "database":
+            return super().get_user(validated_token)
+        if source == "claims" and all(claim in validated_token for claim in USER_CLAIMS):
+            return self.get_claims_user(validated_token)
+
+        try:
+            key = user_cache_key(validated_token[api_settings.USER_ID_CLAIM])
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+        user = cache.get(key)
+        if user is None:
+            # Only active users get this far, so a cached user is an active one
+            user = super().get_user(validated_token)
+            cache.set(key, user, settings.JWT_USER_CACHE_TIMEOUT)
+        elif api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed("The user's password has been changed.")
+        return user
+
+    def get_claims_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken("Token contained no recognizable user identification")
+        loaded = {claim: validated_token[claim] for claim in USER_CLAIMS}
+        loaded[api_settings.USER_ID_FIELD] = validated_token[api_settings.USER_ID_CLAIM]
+        loaded["is_active"] = True
+        # Fields missing from from_db() are deferred and load on first access
+        fields = [
+            field.attname
+            for field in self.user_model._meta.concrete_fields
+            if field.attname in loaded
+        ]
+        return self.user_model.from_db("default", fields, [loaded[name] for name in fields])
+
+
+def load_deferred_fields(user):
+    """Fetch every field a "claims" user left deferred, in one query."""
+    deferred = user.get_deferred_fields()
+    if deferred:
+        user.refresh_from_db(fields=deferred)
+    return user
+
+
+async def aget_request_user(request):
+    """
+    Resolve the user of a plain async Django view, where DRF authentication is not
+    available. Accepts a JWT in the Authorization header or in ``?token=`` (browsers'
+    EventSource cannot set headers), falling back to the session user.
+    """
+    raw_token = request.GET.get("token")
+    header = request.headers.get("Authorization", "")
+    if header.startswith("Bearer "):
+        raw_token = header.split(" ", 1)[1].strip()
+
+    if not raw_token:
+        return await request.auser()
+
+    authentication = CachedJWTAuthentication()
+    try:
+        validated_token = authentication.get_validated_token(raw_token)
+        return await sync_to_async(authentication.get_user)(validated_token)
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return AnonymousUser()
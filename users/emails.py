@@ -0,0 +1,129 @@
+import logging
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_email(subject, message, recipient_list, from_email=None):
+    """
+    Queue an email in the outbox instead of talking to SMTP inside the request.
+
+    When EMAIL_OUTBOX_ENABLED is off the email is still recorded, but delivered
+    immediately (see send_now).
+    """
+    email = OutgoingEmail.objects.create(
+        subject=subject,
+        body=message,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(recipient_list),
+    )
+    if not settings.EMAIL_OUTBOX_ENABLED:
+        send_now(email)
+    return email
+
+
+def send_now(email):
+    """
+    Deliver an email inside the request. No worker retries it, so a failure marks it
+    failed and is re-raised to the caller, like send_mail(fail_silently=False).
+    """
+    message = EmailMessage(email.subject, email.body, email.from_email, email.to)
+    try:
+        message.send(fail_silently=False)
+    except Exception as exc:
+        OutgoingEmail.objects.filter(id=email.id).update(
+            status=OutgoingEmail.FAILED, attempts=1, last_error=str(exc)
+        )
+        raise
+    OutgoingEmail.objects.filter(id=email.id).update(
+        status=OutgoingEmail.SENT, sent_at=timezone.now()
+    )
+
+
+def claim_batch(batch_size):
+    """
+    Atomically mark up to batch_size due emails as being sent by this caller.
+
+    The conditional UPDATE makes concurrent workers (threads or processes) claim
+    disjoint batches; emails left in "sending" by a crashed worker are reclaimed
+    after EMAIL_OUTBOX_CLAIM_TIMEOUT.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.EMAIL_OUTBOX_CLAIM_TIMEOUT)
+    claimable = Q(status=OutgoingEmail.PENDING, next_attempt_at__lte=now) | Q(
+        status=OutgoingEmail.SENDING, claimed_at__lt=stale
+    )
+    ids = list(
+        OutgoingEmail.objects.filter(claimable)
+        .order_by("next_attempt_at", "id")
+        .values_list("id", flat=True)[:batch_size]
+    )
+    if not ids:
+        return []
+
+    token = uuid.uuid4()
+    OutgoingEmail.objects.filter(claimable, id__in=ids).update(
+        status=OutgoingEmail.SENDING, claim_token=token, claimed_at=now
+    )
+    return list(OutgoingEmail.objects.filter(claim_token=token, status=OutgoingEmail.SENDING))
+
+
+def deliver_batch(emails, connection=None):
+    """Send emails over a single SMTP connection. Returns (sent, failed) counts."""
+    if not emails:
+        return 0, 0
+
+    connection = connection or get_connection(fail_silently=False)
+    sent_ids = []
+    failed = 0
+    try:
+        connection.open()
+    except Exception as exc:
+        for email in emails:
+            schedule_retry(email, exc)
+        return 0, len(emails)
+
+    try:
+        for email in emails:
+            message = EmailMessage(
+                email.subject, email.body, email.from_email, email.to, connection=connection
+            )
+            try:
+                message.send(fail_silently=False)
+            except Exception as exc:
+                schedule_retry(email, exc)
+                failed += 1
+            else:
+                sent_ids.append(email.id)
+    finally:
+        connection.close()
+
+    if sent_ids:
+        OutgoingEmail.objects.filter(id__in=sent_ids).update(
+            status=OutgoingEmail.SENT, sent_at=timezone.now(), claim_token=None, last_error=""
+        )
+    return len(sent_ids), failed
+
+
+def schedule_retry(email, exc):
+    """Back off exponentially, giving up after EMAIL_OUTBOX_MAX_ATTEMPTS."""
+    email.attempts += 1
+    email.last_error = str(exc)
+    email.claim_token = None
+    if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        email.status = OutgoingEmail.FAILED
+        logger.error("Giving up on email %s after %s attempts: %s", email.id, email.attempts, exc)
+    else:
+        email.status = OutgoingEmail.PENDING
+        delay = settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (email.attempts - 1)
+        email.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+        logger.warning("Email %s failed (attempt %s): %s", email.id, email.attempts, exc)
+    email.save(update_fields=["attempts", "last_error", "claim_token", "status", "next_attempt_at"])
@@ -0,0 +1,310 @@
+import json
+import statistics
+import time as timer
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import URLResolver, get_resolver
+
+from tracker.models import Note
+from users.authentication import UserRefreshToken
+from users.seeding import seed_dataset
+
+# Route (URL name, or pattern for unnamed routes) -> (method, path, JSON body).
+# Paths are formatted with the ids of the benchmark user's own objects.
+ENDPOINTS = {
+    "notes-list": ("GET", "/api/notes/", None),
+    "note-detail": ("GET", "/api/notes/{note}/", None),
+    "profile": ("GET", "/api/users/profile/", None),
+    "all-usernames": ("GET", "/api/users/all-usernames/", None),
+    "pages-list": ("GET", "/api/collections/", None),
+    "pages-detail": ("GET", "/api/collections/{collection}/", None),
+    "page-by-token": ("GET", "/api/collections/token/{token}/", None),
+    "shared-collections": ("GET", "/api/collections/shared-collections/", None),
+    "collection-tasks": ("GET", "/api/collections/{collection}/tasks/", None),
+    "get-share-settings": ("GET", "/api/collections/{collection}/get-share-settings/", None),
+    "shared-users": ("GET", "/api/collections/{collection}/shared-users/", None),
+    "share-page": (
+        "POST",
+        "/api/collections/share/",
+        {"page_id": "{collection}", "usernames": ["{other_username}"], "permission": "view"},
+    ),
+    "user-notifications": ("GET", "/api/notifications/my/", None),
+    "api/notifications/unread_count/": ("GET", "/api/notifications/unread_count/", None),
+    "api/notifications/mark_as_read/": ("POST", "/api/notifications/mark_as_read/", {}),
+    "tasks-list": ("GET", "/api/tasks/", None),
+    "tasks-calendar": ("GET", "/api/tasks/calendar/?from={month_start}&to={month_end}", None),
+    "tasks-detail": ("GET", "/api/tasks/{task}/", None),
+    "tasks-bulk": (
+        "POST",
+        "/api/tasks/bulk/",
+        {"operations": [{"op": "update", "id": "{task}", "data": {"completed": True}}]},
+    ),
+}
+
+# Routes deliberately not measured, with the reason shown in the report
+SKIPPED = {
+    "register": "creates accounts",
+    "login": "dominated by password hashing",
+    "token_refresh": "no database work",
+    "email-verify": "one-shot token",
+    "resend-verify": "sends email",
+    "password-reset-request": "sends email",
+    "password-reset-confirm": "one-shot token",
+    "change-password": "dominated by password hashing",
+    "account-management": "deactivates the account",
+    "deactivate-account": "deactivates the account",
+    "delete-account": "deletes the account",
+    "page-share-settings": "changes the link settings used by other routes",
+    "unshare-all-users": "removes the shares used by other routes",
+    "add-to-shared": "one-shot per user and token",
+    "notification-stream": "long-lived event stream",
+    "chat_view": "calls the Gemini API",
+    "chat-stream": "calls the Gemini API",
+    "chat-stats": "staff only, no database access",
+    "slow-requests": "staff only, no database access",
+    "metrics": "scraper endpoint, not a user-facing route",
+    "api-root": "DRF router index",
+    "schema-swagger-ui": "API documentation",
+    "schema-redoc": "API documentation",
+    "schema-json": "API documentation",
+}
+
+# The benchmark caches into a private in-process cache, which it clears before every
+# route, so the server's own cache (possibly shared with running workers) is untouched
+BENCHMARK_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "benchmark",
+    }
+}
+
+# Queries allowed for the first (uncached) request, including the one that loads the
+# JWT user (skipped with JWT_USER_SOURCE=claims). Budgets must not depend on the amount
+# of data: a route that needs more queries at a larger scale has an N+1.
+QUERY_BUDGETS = {
+    "notes-list": 3,
+    "note-detail": 3,
+    "profile": 2,
+    "all-usernames": 2,
+    "pages-list": 3,
+    "pages-detail": 3,
+    "page-by-token": 2,
+    "shared-collections": 2,
+    "collection-tasks": 3,
+    "get-share-settings": 3,
+    "shared-users": 3,
+    "share-page": 12,
+    "user-notifications": 2,
+    "api/notifications/unread_count/": 2,
+    "api/notifications/mark_as_read/": 6,
+    "tasks-list": 2,
+    "tasks-calendar": 3,
+    "tasks-detail": 3,
+    "tasks-bulk": 7,
+}
+
+
+def fill(value, context):
+    """Replace "{name}" placeholders in a JSON body, keeping the context value's type."""
+    if isinstance(value, dict):
+        return {key: fill(item, context) for key, item in value.items()}
+    if isinstance(value, list):
+        return [fill(item, context) for item in value]
+    if isinstance(value, str) and value.startswith("{") and value.endswith("}"):
+        return context[value[1:-1]]
+    return value
+
+
+def api_routes():
+    """Every (key, pattern) served by the project URLconf, without admin and format suffixes."""
+    routes = {}
+
+    def walk(patterns, prefix=""):
+        for pattern in patterns:
+            route = prefix + str(pattern.pattern)
+            if isinstance(pattern, URLResolver):
+                if not route.startswith("admin/"):
+                    walk(pattern.url_patterns, route)
+            elif "format" not in pattern.pattern.regex.groupindex:
+                routes.setdefault(pattern.name or route, route)
+
+    walk(get_resolver().url_patterns)
+    return routes
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds data at several scales and records query count, p50/p95 latency and "
+        "response size for every API route. Fails when a route exceeds its query "
+        "budget. Runs in a throwaway test database, dropped at the end."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scales",
+            default="100,10000,100000",
+            help="Comma separated total task counts to measure",
+        )
+        parser.add_argument("--repeat", type=int, default=20, help="Requests per route and scale")
+        parser.add_argument(
+            "--tasks-per-user",
+            type=int,
+            default=100,
+            help="Tasks seeded per user; larger scales add users rather than tasks per user",
+        )
+        parser.add_argument("--output", help="Write the JSON report to this file")
+        parser.add_argument("--budgets", help="JSON file of route -> query budget overrides")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        budgets = dict(QUERY_BUDGETS)
+        if options["budgets"]:
+            with open(options["budgets"]) as budget_file:
+                budgets.update(json.load(budget_file))
+
+        routes = api_routes()
+        unmapped = sorted(set(routes) - set(ENDPOINTS) - set(SKIPPED))
+        report = {
+            "database": connection.vendor,
+            "scales": [],
+            "skipped": {key: SKIPPED[key] for key in sorted(routes) if key in SKIPPED},
+            "violations": [f"{key}: route is not covered by the benchmark" for key in unmapped],
+        }
+
+        # Allows the test client's host and keeps email in memory (already done when
+        # running under the test runner)
+        try:
+            setup_test_environment()
+            own_environment = True
+        except RuntimeError:
+            own_environment = False
+        # Seed a throwaway test database rather than the configured one, where a live
+        # server would wait on the benchmark's write lock for the whole run. Under the
+        # test runner, the database in use already is a test database.
+        database_name = connection.settings_dict["NAME"]
+        if own_environment:
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(CACHES=BENCHMARK_CACHES), transaction.atomic():
+                try:
+                    self._measure(options, routes, budgets, report)
+                finally:
+                    cache.clear()
+                transaction.set_rollback(True)
+        finally:
+            if own_environment:
+                connection.creation.destroy_test_db(database_name, verbosity=0)
+                teardown_test_environment()
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as report_file:
+                report_file.write(output)
+            self.stdout.write(f"Report written to {options['output']}")
+        else:
+            self.stdout.write(output)
+
+        if report["violations"]:
+            raise CommandError(
+                "Benchmark failed:\n" + "\n".join(f"  {v}" for v in report["violations"])
+            )
+        self.stdout.write(self.style.SUCCESS("All routes within their query budgets."))
+
+    def _measure(self, options, routes, budgets, report):
+        tasks_per_user = options["tasks_per_user"]
+        collections_per_user = 4
+        seeded_users = 0
+        context = None
+
+        for scale in sorted(int(value) for value in options["scales"].split(",")):
+            # Keep the benchmark user's own data fixed while the tables grow around it
+            users = max(2, -(-scale // tasks_per_user)) - seeded_users
+            if users > 0:
+                data = seed_dataset(
+                    users,
+                    collections_per_user,
+                    max(1, tasks_per_user // collections_per_user),
+                    username_prefix=f"bench{seeded_users}_",
+                    seed=options["seed"] + seeded_users,
+                )
+                seeded_users += users
+                if context is None:
+                    context = self._context(data)
+            self.stderr.write(f"Measuring {scale} tasks ({seeded_users} users)...")
+
+            client = Client(HTTP_AUTHORIZATION=f"Bearer {context['access_token']}")
+            results = []
+            for key in sorted(set(routes) & set(ENDPOINTS)):
+                result = self._measure_route(client, key, context, options["repeat"])
+                result["budget"] = budgets.get(key)
+                results.append(result)
+                if result["status"] >= 500:
+                    report["violations"].append(f"{key} at {scale}: HTTP {result['status']}")
+                if result["budget"] is not None and result["queries"] > result["budget"]:
+                    report["violations"].append(
+                        f"{key} at {scale}: {result['queries']} queries "
+                        f"(budget {result['budget']})"
+                    )
+            report["scales"].append({"tasks": scale, "users": seeded_users, "routes": results})
+
+    def _context(self, data):
+        user = data.users[0]
+        collection = next(c for c in data.collections if c.owner_id == user.id)
+        collection.is_link_shareable = True
+        collection.save(update_fields=["is_link_shareable"])
+        task = next(t for t in data.tasks if t.collection_id == collection.id)
+        note = Note.objects.create(user=user, task=task, title="Benchmark", content="Benchmark")
+        month_start = date.today().replace(day=1)
+        return {
+            "access_token": str(UserRefreshToken.for_user(user).access_token),
+            "collection": collection.id,
+            "token": collection.shareable_link_token,
+            "task": task.id,
+            "note": note.id,
+            "other_username": data.users[1].username,
+            "month_start": month_start.isoformat(),
+            "month_end": (month_start + timedelta(days=30)).isoformat(),
+        }
+
+    def _measure_route(self, client, key, context, repeat):
+        method, path, body = ENDPOINTS[key]
+        path = path.format(**context)
+        payload = json.dumps(fill(body, context)) if body is not None else None
+        send = getattr(client, method.lower())
+
+        def request():
+            if payload is None:
+                return send(path)
+            return send(path, payload, content_type="application/json")
+
+        # Counted with a wrapper: request_started resets connection.queries_log
+        queries = []
+
+        def count(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        cache.clear()
+        with connection.execute_wrapper(count):
+            response = request()
+        timings = []
+        for _ in range(repeat):
+            started = timer.perf_counter()
+            request()
+            timings.append((timer.perf_counter() - started) * 1000)
+        timings.sort()
+        return {
+            "route": key,
+            "method": method,
+            "path": path,
+            "status": response.status_code,
+            "queries": len(queries),
+            "p50_ms": round(statistics.median(timings), 2),
+            "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+            "bytes": len(response.content),
+        }
@@ -1,8 +1,10 @@
 import os
 import random
+import time as time_module
 import uuid
 from datetime import datetime, timedelta, time
-from django.core.management.base import BaseCommand
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
 from django.utils import timezone
 from django.conf import settings
 from django.contrib.auth import get_user_model
@@ -13,13 +15,41 @@ from pages.models import Collection
 from tasks.models import Task
 from tracker.models import Note
 from sharing.models import SharedPage
+from users.seeding import seed_dataset
 
 User = get_user_model()
 
 class Command(BaseCommand):
-    help = 'Generates dummy data for demonstration purposes'
+    help = (
+        'Generates dummy data for demonstration purposes. With --users it instead '
+        'bulk-generates a large synthetic dataset for load and capacity testing.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users', type=int, help='Bulk mode: number of synthetic users to generate'
+        )
+        parser.add_argument('--collections-per-user', type=int, default=5)
+        parser.add_argument('--tasks-per-collection', type=int, default=20)
+        parser.add_argument(
+            '--notes-per-task', type=float, default=0.3, help='Average notes per task (0-1)'
+        )
+        parser.add_argument('--shares-per-collection', type=int, default=1)
+        parser.add_argument('--seed', type=int, help='Random seed for reproducible data')
+        parser.add_argument(
+            '--chunk-users', type=int, default=200,
+            help='Users written per transaction in bulk mode'
+        )
+        parser.add_argument('--username-prefix', default='loadtest')
+        parser.add_argument('--password', default='password123')
 
     def handle(self, *args, **kwargs):
+        if kwargs['users']:
+            self._bulk_generate(kwargs)
+            return
+
+        if kwargs['seed'] is not None:
+            random.seed(kwargs['seed'])
         self.stdout.write(self.style.SUCCESS('Starting dummy data generation...'))
         
         # Create users
@@ -35,6 +65,51 @@ class Command(BaseCommand):
         
         self.stdout.write(self.style.SUCCESS('Successfully generated dummy data!'))
     
+    def _bulk_generate(self, options):
+        """
+        Write users in chunks, each chunk in one transaction of batched bulk_create
+        calls, printing a progress line per chunk instead of per row. Shares are made
+        between users of the same chunk.
+        """
+        prefix = options['username_prefix']
+        if User.objects.filter(username__startswith=prefix).exists():
+            raise CommandError(
+                f'Users named "{prefix}..." already exist; pass another --username-prefix.'
+            )
+
+        total_users = options['users']
+        chunk_size = max(2, options['chunk_users'])
+        password_hash = make_password(options['password'])
+        totals = {'users': 0, 'collections': 0, 'tasks': 0, 'notes': 0}
+        started = time_module.monotonic()
+
+        for start in range(0, total_users, chunk_size):
+            data = seed_dataset(
+                min(chunk_size, total_users - start),
+                options['collections_per_user'],
+                options['tasks_per_collection'],
+                notes_per_task=options['notes_per_task'],
+                shares_per_collection=options['shares_per_collection'],
+                password_hash=password_hash,
+                username_prefix=prefix,
+                start_index=start,
+                seed=None if options['seed'] is None else options['seed'] + start,
+            )
+            for name in totals:
+                totals[name] += len(getattr(data, name))
+            elapsed = time_module.monotonic() - started
+            self.stdout.write(
+                f"{totals['users']}/{total_users} users, {totals['collections']} collections, "
+                f"{totals['tasks']} tasks, {totals['notes']} notes "
+                f"({elapsed:.1f}s, {totals['tasks'] / elapsed:.0f} tasks/s)"
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {totals['tasks']} tasks for {totals['users']} users in "
+            f"{time_module.monotonic() - started:.1f}s. "
+            f"Log in as {prefix}0 / {options['password']}."
+        ))
+
     def _create_users(self):
         """Create demo users with realistic profiles"""
         self.stdout.write('Creating users...')
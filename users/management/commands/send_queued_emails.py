@@ -0,0 +1,69 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from users.emails import claim_batch, deliver_batch
+
+
+class Command(BaseCommand):
+    help = "Delivers queued outbox emails, retrying failures with exponential backoff"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4, help="Sender threads")
+        parser.add_argument(
+            "--batch-size", type=int, default=50, help="Emails sent per SMTP connection"
+        )
+        parser.add_argument(
+            "--interval", type=float, default=5.0, help="Seconds to sleep when the queue is empty"
+        )
+        parser.add_argument(
+            "--once", action="store_true", help="Drain the queue once and exit instead of polling"
+        )
+
+    def handle(self, *args, **options):
+        workers = max(1, options["workers"])
+        total_sent = total_failed = 0
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="outbox") as pool:
+            try:
+                while True:
+                    futures = [
+                        pool.submit(self._drain, options["batch_size"]) for _ in range(workers)
+                    ]
+                    sent = failed = 0
+                    for future in futures:
+                        batch_sent, batch_failed = future.result()
+                        sent += batch_sent
+                        failed += batch_failed
+                    total_sent += sent
+                    total_failed += failed
+                    if sent or failed:
+                        self.stdout.write(f"Sent {sent} emails, {failed} failed")
+                    if options["once"]:
+                        break
+                    if not sent and not failed:
+                        time.sleep(options["interval"])
+            except KeyboardInterrupt:
+                pass
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Outbox worker done: {total_sent} sent, {total_failed} failed.")
+        )
+
+    def _drain(self, batch_size):
+        """Claim and send batches until nothing is due. Runs in a worker thread."""
+        sent = failed = 0
+        try:
+            while True:
+                batch = claim_batch(batch_size)
+                if not batch:
+                    break
+                batch_sent, batch_failed = deliver_batch(batch)
+                sent += batch_sent
+                failed += batch_failed
+        finally:
+            # Each thread has its own database connection
+            connections.close_all()
+        return sent, failed
@@ -0,0 +1,156 @@
+import random
+from collections import namedtuple
+from datetime import date, time, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from notifications.counters import increment_unread
+from notifications.models import Notification
+from pages.models import Collection
+from sharing.models import CollectionAccess, SharedPage
+from tasks.models import Task
+from tracker.models import Note
+from users.models import User
+
+SeededData = namedtuple("SeededData", ["users", "collections", "tasks", "notes"])
+
+CATEGORIES = ["Work", "Personal", "Health", "Study", "Errands", "Meeting"]
+COLORS = ["#039be5", "#33b679", "#f6bf26", "#e67c73", "#8e24aa", "#616161"]
+TASK_TITLES = [
+    "Review pull requests",
+    "Team standup",
+    "Gym session",
+    "Grocery shopping",
+    "Read a chapter",
+    "Pay bills",
+    "Plan sprint",
+    "Call the dentist",
+    "Write report",
+    "Meal prep",
+    "Water the plants",
+    "Update portfolio",
+]
+
+
+def seed_dataset(
+    users,
+    collections_per_user,
+    tasks_per_collection,
+    notes_per_task=0.3,
+    shares_per_collection=1,
+    password="password123",
+    password_hash=None,
+    username_prefix="user",
+    start_index=0,
+    seed=None,
+    today=None,
+    batch_size=2000,
+):
+    """
+    Bulk-create users with collections, tasks, notes and shares in a fixed number of
+    queries per batch. bulk_create skips signals, so the access index rows, share
+    notifications and unread counters are written here as well.
+
+    Tasks are spread from 30 days back to 60 days ahead of ``today``; ``seed`` makes
+    the data reproducible. Every user gets the same ``password``, hashed once (or pass
+    an already hashed ``password_hash``).
+    """
+    rng = random.Random(seed)
+    today = today or date.today()
+    # Hashing is by far the slowest step; callers seeding in chunks pass the hash along
+    hashed_password = password_hash or make_password(password)
+
+    with transaction.atomic():
+        created_users = User.objects.bulk_create(
+            [
+                User(
+                    username=f"{username_prefix}{index}",
+                    email=f"{username_prefix}{index}@example.com",
+                    password=hashed_password,
+                    first_name=username_prefix.capitalize(),
+                    last_name=str(index),
+                    is_active=True,
+                )
+                for index in range(start_index, start_index + users)
+            ],
+            batch_size=batch_size,
+        )
+
+        collections = Collection.objects.bulk_create(
+            [
+                Collection(title=f"{user.username} collection {index}", owner=user)
+                for user in created_users
+                for index in range(collections_per_user)
+            ],
+            batch_size=batch_size,
+        )
+        access = [
+            CollectionAccess(user_id=collection.owner_id, collection=collection, permission="owner")
+            for collection in collections
+        ]
+
+        shares = []
+        for collection in collections:
+            # One extra pick so dropping the owner still leaves enough users
+            picked = rng.sample(created_users, min(shares_per_collection + 1, len(created_users)))
+            sharees = [user for user in picked if user.id != collection.owner_id]
+            for user in sharees[:shares_per_collection]:
+                permission = rng.choice(["view", "edit"])
+                shares.append(SharedPage(page=collection, shared_with=user, permission=permission))
+                access.append(
+                    CollectionAccess(user=user, collection=collection, permission=permission)
+                )
+        SharedPage.objects.bulk_create(shares, batch_size=batch_size)
+        CollectionAccess.objects.bulk_create(access, batch_size=batch_size)
+
+        owners = {user.id: user for user in created_users}
+        Notification.objects.bulk_create(
+            [
+                Notification(
+                    recipient=share.shared_with,
+                    sender_id=share.page.owner_id,
+                    message=f"{owners[share.page.owner_id].username} has shared a page with you.",
+                    link=f"/collections/{share.page.id}/",
+                )
+                for share in shares
+            ],
+            batch_size=batch_size,
+        )
+        increment_unread([share.shared_with_id for share in shares])
+
+        tasks = []
+        for collection in collections:
+            for _ in range(tasks_per_collection):
+                start = rng.randrange(6, 21)
+                tasks.append(
+                    Task(
+                        owner_id=collection.owner_id,
+                        collection=collection,
+                        title=rng.choice(TASK_TITLES),
+                        details="Generated task",
+                        due_date=today + timedelta(days=rng.randrange(-30, 61)),
+                        start_time=time(start, rng.choice([0, 15, 30, 45])),
+                        end_time=time(start + 1, rng.choice([0, 15, 30, 45])),
+                        category=rng.choice(CATEGORIES),
+                        color=rng.choice(COLORS),
+                        completed=rng.random() < 0.3,
+                    )
+                )
+        tasks = Task.objects.bulk_create(tasks, batch_size=batch_size)
+
+        notes = Note.objects.bulk_create(
+            [
+                Note(
+                    user_id=task.owner_id,
+                    task=task,
+                    title=f"Note on {task.title}",
+                    content="Remember to follow up on this.",
+                )
+                for task in tasks
+                if rng.random() < notes_per_task
+            ],
+            batch_size=batch_size,
+        )
+
+    return SeededData(created_users, collections, tasks, notes)
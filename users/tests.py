@@ -1,10 +1,27 @@
+import json
+import os
+import tempfile
 import uuid
+from io import StringIO
+from smtplib import SMTPException
+from unittest.mock import patch
 from datetime import datetime, timedelta
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase, APIClient
 from django.contrib.auth import get_user_model
-from users.models import EmailVerificationToken, PasswordResetToken
+from rest_framework_simplejwt.tokens import AccessToken
+from users.authentication import UserRefreshToken
+from users.emails import claim_batch, deliver_batch, enqueue_email
+from users.models import EmailVerificationToken, OutgoingEmail, PasswordResetToken
+from users.seeding import seed_dataset
+from notifications.counters import get_unread_count
+from sharing.models import CollectionAccess
 from pages.models import Collection
 from sharing.models import SharedPage
 from tasks.models import Task
@@ -16,6 +33,8 @@ User = get_user_model()
 class BaseAPITestCase(APITestCase):
     def setUp(self):
         self.client = APIClient()
+        # Database ids are reused between tests, so cached responses must not leak
+        cache.clear()
 
         # Create test users with custom User model fields
         self.user1 = User.objects.create_user(
@@ -105,3 +124,259 @@ class AuthenticationTests(BaseAPITestCase):
         self.assertEqual(response.data["user"]["username"], "user1")
         self.assertEqual(response.data["user"]["email"], "user1@example.com")
         self.assertEqual(response.data["user"]["phone_number"], "+1234567890")
+
+
+class CachedJWTAuthenticationTests(BaseAPITestCase):
+    def authenticate(self, user):
+        token = UserRefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    @override_settings(JWT_USER_SOURCE="database")
+    def test_database_mode_loads_user_per_request(self):
+        self.authenticate(self.user1)
+        with self.assertNumQueries(2):
+            self.client.get(reverse("tasks-list"))
+
+    @override_settings(JWT_USER_SOURCE="cache")
+    def test_cache_mode_skips_user_query_once_cached(self):
+        self.authenticate(self.user1)
+        self.client.get(reverse("tasks-list"))
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("tasks-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(JWT_USER_SOURCE="cache")
+    def test_cache_mode_sees_profile_changes_and_deactivation(self):
+        self.authenticate(self.user1)
+        self.client.get(reverse("profile"))
+
+        self.client.put(reverse("profile"), {"bio": "Updated"}, format="json")
+        self.assertEqual(self.client.get(reverse("profile")).data["bio"], "Updated")
+
+        self.user1.is_active = False
+        self.user1.save()
+        response = self.client.get(reverse("tasks-list"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(JWT_USER_SOURCE="claims")
+    def test_claims_mode_builds_user_without_query(self):
+        self.authenticate(self.user1)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("tasks-list"))
+        self.assertEqual(len(response.data), Task.objects.filter(owner=self.user1).count())
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("profile"))
+        self.assertEqual(response.data["email"], "user1@example.com")
+
+    @override_settings(JWT_USER_SOURCE="claims")
+    def test_refreshed_access_token_reloads_claims(self):
+        self.user1.is_staff = True
+        self.user1.save()
+        refresh = UserRefreshToken.for_user(self.user1)
+        self.assertNotIn("is_staff", refresh.payload)
+        self.assertTrue(refresh.access_token["is_staff"])
+
+        self.user1.is_staff = False
+        self.user1.username = "renamed"
+        self.user1.save()
+        response = self.client.post(
+            reverse("token_refresh"), {"refresh": str(refresh)}, format="json"
+        )
+
+        access = AccessToken(response.data["access"])
+        self.assertEqual((access["is_staff"], access["username"]), (False, "renamed"))
+
+    def test_refresh_rejects_deactivated_user(self):
+        refresh = UserRefreshToken.for_user(self.user1)
+        self.user1.is_active = False
+        self.user1.save()
+        response = self.client.post(
+            reverse("token_refresh"), {"refresh": str(refresh)}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(JWT_USER_SOURCE="claims")
+    def test_claims_mode_falls_back_for_tokens_without_claims(self):
+        token = AccessToken.for_user(self.user1)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        response = self.client.get(reverse("profile"))
+        self.assertEqual(response.data["username"], "user1")
+
+
+@override_settings(EMAIL_OUTBOX_ENABLED=True)
+class EmailOutboxTests(APITestCase):
+    def register(self):
+        data = {
+            "username": "newuser",
+            "email": "newuser@example.com",
+            "password": "Str0ng-pass-123",
+            "password2": "Str0ng-pass-123",
+            "first_name": "New",
+            "last_name": "User",
+        }
+        return self.client.post(reverse("register"), data, format="json")
+
+    def test_register_queues_instead_of_sending(self):
+        response = self.register()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(mail.outbox), 0)
+        queued = OutgoingEmail.objects.get()
+        self.assertEqual(queued.to, ["newuser@example.com"])
+        self.assertEqual(queued.status, OutgoingEmail.PENDING)
+
+    def test_failed_delivery_is_retried_with_backoff(self):
+        email = enqueue_email("Subject", "Body", ["user@example.com"])
+        with patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=SMTPException("boom"),
+        ):
+            self.assertEqual(deliver_batch(claim_batch(10)), (0, 1))
+
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutgoingEmail.PENDING)
+        self.assertEqual(email.attempts, 1)
+        self.assertEqual(email.last_error, "boom")
+        self.assertGreater(email.next_attempt_at, timezone.now())
+        # Not due yet, so nothing is claimed
+        self.assertEqual(claim_batch(10), [])
+
+    @override_settings(EMAIL_OUTBOX_MAX_ATTEMPTS=1)
+    def test_gives_up_after_max_attempts(self):
+        email = enqueue_email("Subject", "Body", ["user@example.com"])
+        with patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=SMTPException("boom"),
+        ):
+            deliver_batch(claim_batch(10))
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutgoingEmail.FAILED)
+
+    def test_claimed_batches_do_not_overlap(self):
+        for index in range(5):
+            enqueue_email(f"Subject {index}", "Body", ["user@example.com"])
+        first = claim_batch(3)
+        second = claim_batch(3)
+        self.assertEqual(len(first), 3)
+        self.assertEqual(len(second), 2)
+        self.assertFalse({e.id for e in first} & {e.id for e in second})
+
+    @override_settings(EMAIL_OUTBOX_ENABLED=False)
+    def test_outbox_disabled_sends_inline(self):
+        self.register()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(OutgoingEmail.objects.get().status, OutgoingEmail.SENT)
+
+    @override_settings(EMAIL_OUTBOX_ENABLED=False)
+    def test_inline_failure_is_raised_not_retried(self):
+        with patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=SMTPException("boom"),
+        ):
+            with self.assertRaises(SMTPException):
+                enqueue_email("Subject", "Body", ["user@example.com"])
+        email = OutgoingEmail.objects.get()
+        self.assertEqual((email.status, email.last_error), (OutgoingEmail.FAILED, "boom"))
+        self.assertEqual(claim_batch(10), [])
+
+
+class EmailOutboxWorkerTests(TransactionTestCase):
+    # The worker sends from its own threads, which only see committed rows
+
+    def test_worker_delivers_queued_emails(self):
+        for index in range(7):
+            enqueue_email(f"Subject {index}", "Body", [f"user{index}@example.com"])
+
+        call_command(
+            "send_queued_emails", "--once", "--workers", "2", "--batch-size", "3", stdout=StringIO()
+        )
+
+        self.assertEqual(len(mail.outbox), 7)
+        self.assertFalse(OutgoingEmail.objects.exclude(status=OutgoingEmail.SENT).exists())
+
+
+class SeedingTests(APITestCase):
+    def test_seed_dataset_builds_consistent_data(self):
+        data = seed_dataset(3, 2, 5, notes_per_task=1, shares_per_collection=1, seed=1)
+
+        self.assertEqual(len(data.users), 3)
+        self.assertEqual(Task.objects.filter(owner__in=data.users).count(), 30)
+        self.assertEqual(len(data.notes), 30)
+        # Owner rows plus one share per collection, as the signals would have written
+        self.assertEqual(CollectionAccess.objects.filter(user__in=data.users).count(), 12)
+        self.assertEqual(SharedPage.objects.filter(page__in=data.collections).count(), 6)
+        self.assertEqual(sum(get_unread_count(user.id) for user in data.users), 6)
+        self.assertTrue(data.users[0].check_password("password123"))
+
+
+class GenerateDummyDataBulkTests(APITestCase):
+    def generate(self, prefix, seed=3):
+        call_command(
+            "generate_dummy_data",
+            users=5,
+            collections_per_user=2,
+            tasks_per_collection=3,
+            seed=seed,
+            chunk_users=2,
+            username_prefix=prefix,
+            stdout=StringIO(),
+        )
+        return list(
+            Task.objects.filter(owner__username__startswith=prefix)
+            .order_by("id")
+            .values_list("title", "due_date")
+        )
+
+    def test_bulk_mode_generates_requested_scale(self):
+        tasks = self.generate("bulk")
+        self.assertEqual(get_user_model().objects.filter(username__startswith="bulk").count(), 5)
+        self.assertEqual(len(tasks), 30)
+        with self.assertRaises(CommandError):
+            self.generate("bulk")
+
+    def test_seed_makes_data_reproducible(self):
+        self.assertEqual(self.generate("first"), self.generate("second"))
+
+
+class BenchmarkApiTests(APITestCase):
+    def run_benchmark(self, *args):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "report.json")
+            try:
+                call_command(
+                    "benchmark_api",
+                    *args,
+                    scales="20,60",
+                    repeat=1,
+                    tasks_per_user=20,
+                    output=output,
+                    stdout=StringIO(),
+                    stderr=StringIO(),
+                )
+            finally:
+                with open(output) as report_file:
+                    self.report = json.load(report_file)
+
+    def test_every_route_is_measured_within_budget(self):
+        self.run_benchmark()
+        self.assertEqual(self.report["violations"], [])
+        routes = {result["route"]: result for result in self.report["scales"][-1]["routes"]}
+        self.assertIn("tasks-list", routes)
+        self.assertEqual(routes["tasks-list"]["status"], 200)
+        self.assertIn("chat_view", self.report["skipped"])
+        # Everything was rolled back
+        self.assertFalse(Task.objects.exists())
+
+    def test_server_cache_is_left_alone(self):
+        cache.set("unrelated", "kept")
+        self.run_benchmark()
+        self.assertEqual(cache.get("unrelated"), "kept")
+
+    def test_exceeded_budget_fails(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as budgets:
+            json.dump({"tasks-list": 1}, budgets)
+        self.addCleanup(os.remove, budgets.name)
+
+        with self.assertRaises(CommandError):
+            self.run_benchmark("--budgets", budgets.name)
+        self.assertIn("tasks-list at 20: 2 queries (budget 1)", self.report["violations"])
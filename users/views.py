@@ -5,7 +5,8 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from django.contrib.auth import authenticate
-from rest_framework_simplejwt.tokens import RefreshToken
+from .authentication import UserRefreshToken, load_deferred_fields
+from .emails import enqueue_email
 from .serializers import (
     UserRegistrationSerializer,
     UserLoginSerializer,
@@ -17,7 +18,6 @@ from .serializers import (
     AccountDeletionSerializer,
 )
 from django.shortcuts import render, get_object_or_404, redirect
-from django.core.mail import send_mail
 from django.conf import settings
 from django.urls import reverse
 from django.utils import timezone
@@ -78,17 +78,15 @@ class RegisterView(APIView):
             # Get frontend URL from settings (removes hardcoded value)
             verification_url = f"{settings.FRONTEND_BASE_URL}/verify-email?token={token.token}"
 
-            # Send verification email
-            send_mail(
+            # Queue verification email
+            enqueue_email(
                 "Activate your Planora account",
                 f"Hi {user.username},\n\nThank you for registering with Planora! "
                 f"Please click the link below to verify your email and activate your account:\n\n"
                 f"{verification_url}\n\n"
                 f"This link will expire in 24 hours.\n\n"
                 f"If you did not create this account, please ignore this email.",
-                settings.DEFAULT_FROM_EMAIL,
                 [user.email],
-                fail_silently=False,
             )
 
             return Response(
@@ -136,7 +134,7 @@ class EmailVerificationView(APIView):
             verification_token.delete()
 
             # Generate tokens for auto-login
-            refresh = RefreshToken.for_user(user)
+            refresh = UserRefreshToken.for_user(user)
 
             return Response(
                 {
@@ -183,17 +181,15 @@ class ResendEmailVerificationView(APIView):
             # Get frontend URL from settings (removes hardcoded value)
             verification_url = f"{settings.FRONTEND_BASE_URL}/verify-email?token={token.token}"
 
-            # Send verification email
-            send_mail(
+            # Queue verification email
+            enqueue_email(
                 "Activate your Planora account",
                 f"Hi {user.username},\n\nYou have requested a new verification link. "
                 f"Please click the link below to verify your email and activate your account:\n\n"
                 f"{verification_url}\n\n"
                 f"This link will expire in 24 hours.\n\n"
                 f"If you did not request this email, please ignore it.",
-                settings.DEFAULT_FROM_EMAIL,
                 [user.email],
-                fail_silently=False,
             )
 
             return Response(
@@ -240,7 +236,7 @@ class LoginView(APIView):
                 # This preserves the original case for authentication
                 authenticated_user = authenticate(username=user.username, password=password)
                 if authenticated_user:
-                    refresh = RefreshToken.for_user(authenticated_user)
+                    refresh = UserRefreshToken.for_user(authenticated_user)
                     return Response(
                         {
                             "refresh": str(refresh),
@@ -269,12 +265,14 @@ class UserProfileView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        serializer = UserSerializer(request.user, context={"request": request})
+        user = load_deferred_fields(request.user)
+        serializer = UserSerializer(user, context={"request": request})
         return Response(serializer.data)
 
     def put(self, request):
+        user = load_deferred_fields(request.user)
         serializer = UserSerializer(
-            request.user, data=request.data, partial=True, context={"request": request}
+            user, data=request.data, partial=True, context={"request": request}
         )
         if serializer.is_valid():
             serializer.save()
@@ -318,17 +316,15 @@ class PasswordResetRequestView(APIView):
                 # Get frontend URL from settings (removes hardcoded value)
                 reset_url = f"{settings.FRONTEND_BASE_URL}/reset-password?token={token.token}"
 
-                # Send password reset email
-                send_mail(
+                # Queue password reset email
+                enqueue_email(
                     "Reset your Planora password",
                     f"Hi {user.username},\n\nWe received a request to reset your password. "
                     f"Please click the link below to set a new password:\n\n"
                     f"{reset_url}\n\n"
                     f"This link will expire in 1 hour.\n\n"
                     f"If you did not request a password reset, please ignore this email.",
-                    settings.DEFAULT_FROM_EMAIL,
                     [user.email],
-                    fail_silently=False,
                 )
 
                 return Response(
@@ -385,7 +381,7 @@ class PasswordResetConfirmView(APIView):
                 token.save()
 
                 # Generate tokens for auto-login
-                refresh = RefreshToken.for_user(user)
+                refresh = UserRefreshToken.for_user(user)
 
                 return Response(
                     {
@@ -409,7 +405,7 @@ class ChangePasswordView(APIView):
         serializer = ChangePasswordSerializer(data=request.data)
         if serializer.is_valid():
             # Check if current password is correct
-            user = request.user
+            user = load_deferred_fields(request.user)
             current_password = serializer.validated_data["current_password"]
             if not user.check_password(current_password):
                 return Response(
@@ -421,7 +417,7 @@ class ChangePasswordView(APIView):
             user.save()
 
             # Generate new tokens
-            refresh = RefreshToken.for_user(user)
+            refresh = UserRefreshToken.for_user(user)
 
             return Response(
                 {